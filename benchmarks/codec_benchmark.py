@@ -0,0 +1,95 @@
+"""Load/save time of the data file for a large synthetic history.
+
+Compares the JSON handling before ``thesis_tracker.codec`` (dates converted to
+strings in place, ``json.dump(default=str, indent=4)``, dates converted back;
+``json.load`` plus ``strptime`` on load) with every codec engine installed, in
+indented and compact mode (orjson writes compact output only).
+
+Run from the repository root:
+
+    python -m benchmarks.codec_benchmark [number of reports]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+
+from thesis_tracker import codec
+from thesis_tracker.synthetic import synthetic_data
+
+REPEAT = 3
+
+
+# The JSON handling before the codec, for comparison, on dicts instead of
+# records: saving converted the dates to strings in place, dumped, and
+# converted them back
+def legacy_dumps(data):
+    for report in data.get("reports", []):
+        if isinstance(report["date"], datetime):
+            report["date"] = report["date"].isoformat()
+    raw = json.dumps(data, default=str, indent=4).encode()
+    _legacy_decode(data)
+    return raw
+
+
+def legacy_loads(raw):
+    return _legacy_decode(json.loads(raw))
+
+
+def _legacy_decode(data):
+    for report in data.get("reports", []):
+        if isinstance(report["date"], str):
+            report["date"] = datetime.fromisoformat(report["date"])
+    for todo in data.get("todo", []):
+        if "due_date" in todo and isinstance(todo["due_date"], str):
+            todo["due_date"] = datetime.strptime(todo["due_date"], "%Y-%m-%d").date()
+    return data
+
+
+# Best wall time of REPEAT calls, in seconds
+def best_time(function, *args):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n_reports=100_000):
+    data = synthetic_data(n_reports)
+    # The same data as plain dicts
+    legacy_data = legacy_loads(codec.dumps(data))
+    rows = []
+    raw = legacy_dumps(legacy_data)
+    rows.append(
+        (
+            "legacy (json, indent=4)",
+            best_time(legacy_dumps, legacy_data),
+            best_time(legacy_loads, raw),
+            len(raw),
+        )
+    )
+    for engine in codec.ENGINES:
+        # orjson only writes compact output
+        for compact in [True] if engine == "orjson" else [False, True]:
+            raw = codec.dumps(data, compact=compact, engine=engine)
+            assert codec.loads(raw, engine=engine) == data
+            rows.append(
+                (
+                    f"{engine}{', compact' if compact else ''}",
+                    best_time(codec.dumps, data, compact, engine),
+                    best_time(codec.loads, raw, engine),
+                    len(raw),
+                )
+            )
+
+    print(f"{n_reports} reports, best of {REPEAT}")
+    print(f"{'codec':<26}{'save (s)':>10}{'load (s)':>10}{'size (MB)':>11}")
+    for name, save, load, size in rows:
+        print(f"{name:<26}{save:>10.3f}{load:>10.3f}{size / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
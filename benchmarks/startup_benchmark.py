@@ -0,0 +1,83 @@
+"""Cold start and rerun time of the app script.
+
+Every measurement runs in a fresh interpreter, so the first run pays for
+importing Streamlit, the app's modules and whatever the first page loads.
+The app is driven with Streamlit's ``AppTest`` on a synthetic data file:
+
+* cold start: the first run of the script, showing the page first opened,
+* rerun: the mean time of further runs of that page,
+
+and the table notes whether pandas and plotly.express had been imported after
+the first run of a page.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_benchmark [number of reports]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RERUNS = 10
+PAGES = ["Home 🏠", "To-Do List 📋", "Progress 📊", "Statistics 📈", "Gantt Chart 📅"]
+# Streamlit itself imports plotly.graph_objects, but not these
+HEAVY_MODULES = ["pandas", "plotly.express"]
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Time the app in this interpreter, starting on page; prints the results as JSON
+def measure(page):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(REPO, "thesis_tracker_app.py"))
+    start = time.perf_counter()
+    if page != "Home 🏠":
+        app.session_state.page = page
+    app.run(timeout=300)
+    cold = time.perf_counter() - start
+    loaded = [module for module in HEAVY_MODULES if module in sys.modules]
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        app.run(timeout=300)
+    rerun = (time.perf_counter() - start) / RERUNS
+    if app.exception:
+        raise RuntimeError(app.exception)
+    print(json.dumps({"cold": cold, "rerun": rerun, "loaded": loaded}))
+
+
+def main(n_reports=10_000):
+    from thesis_tracker.synthetic import write_synthetic
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic(os.path.join(directory, "thesis_data.json"), n_reports, 200)
+        env = dict(os.environ, PYTHONPATH=REPO)
+        for page in PAGES:
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup_benchmark", "--page", page],
+                cwd=directory,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            rows.append((page, json.loads(result.stdout.splitlines()[-1])))
+
+    print(f"{n_reports} reports, mean of {RERUNS} reruns")
+    print(f"{'first page':<22}{'cold (s)':>10}{'rerun (s)':>11}  loaded")
+    for page, result in rows:
+        print(
+            f"{page:<22}{result['cold']:>10.2f}{result['rerun']:>11.3f}  "
+            f"{', '.join(result['loaded']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--page"]:
+        measure(sys.argv[2])
+    else:
+        main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,191 @@
+"""Benchmarks of the data and analytics layer, checked against baselines.
+
+Every case runs headless on a synthetic history of one size:
+
+* load / save: reading and writing the data files of the storage backend,
+* open: loading a dataset with its indexes and rollups,
+* filter/sort: to-do filters and sort orders of the To-Do page,
+* weekly grouping: grouping the reports by week, as on the Reports page,
+* text index / search: building the full-text indexes of the reports and
+  to-dos, and prefix searches in them,
+* statistics: the report rollups and the daily frame of the Statistics page,
+* figures: the Statistics, Progress and Gantt figures.
+
+The best of ``REPEAT`` wall times of each case is compared with the baseline
+recorded in ``baselines.json``; a case more than ``TOLERANCE`` times slower
+(and slower by more than ``NOISE`` seconds) is a regression, and the suite
+exits with status 1. Baselines are machine-specific: record them again with
+``--record`` on the machine that checks them.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--size small|medium|large] [--record]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from thesis_tracker import charts
+from thesis_tracker.dataset import open_dataset
+from thesis_tracker.gantt import gantt_bars
+from thesis_tracker.indexes import ReportIndex, build_indexes
+from thesis_tracker.rollups import ReportRollups
+from thesis_tracker.storage import create_backend
+from thesis_tracker.synthetic import write_synthetic
+
+REPEAT = 3
+TOLERANCE = 1.5
+NOISE = 0.005
+MODE = "journal"
+# (reports, to-dos) of each size
+SIZES = {
+    "small": (1_000, 100),
+    "medium": (100_000, 10_000),
+    "large": (1_000_000, 100_000),
+}
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def _filter_sort(dataset):
+    index = dataset.indexes["todo"]
+    index.filter(sort_by="Due Date")
+    index.filter(categories=["Writing", "Research"], sort_by="Priority")
+    index.filter(priorities=["High"], tags=["Urgent"], sort_by="Estimated Time")
+    index.filter(categories=["Meetings"])
+
+
+def _weekly_grouping(dataset):
+    index = ReportIndex(dataset.data["reports"])
+    for week in index.newest_weeks():
+        index.week_reports(week)
+
+
+def _text_indexes(dataset):
+    for index in build_indexes(dataset.data).values():
+        index.text
+
+
+# The first call builds the full-text indexes; the best time is that of the
+# queries alone
+def _search(dataset):
+    for query in ["thesis", "pap", "task 1", "to-do 12", "t"]:
+        dataset.search("reports", query, 25)
+        dataset.search("todo", query, 25)
+
+
+def _statistics(dataset):
+    rollups = ReportRollups.from_reports(dataset.data["reports"])
+    rollups.totals()
+    rollups.category_stats()
+    charts.daily_frame(rollups)
+
+
+def _figures(dataset):
+    frame = charts.daily_frame(dataset.rollups)
+    for columns in [["Time Spent"], ["Result Rating", "Focus Rating"]]:
+        charts.daily_figure(frame, columns)
+    charts.category_figure(dataset.rollups.category_stats())
+    progress = dataset.data["progress"]
+    charts.progress_figure(list(progress), list(progress.values()))
+    charts.gantt_figure(gantt_bars(dataset.data["todo"])[1])
+
+
+# Name and function of each case; all take the dataset and its directory
+CASES = [
+    ("load", lambda dataset, directory: create_backend(MODE, directory).load()),
+    # Through the dataset's backend, which knows the version of its data
+    ("save", lambda dataset, directory: dataset.backend.save(dataset.data)),
+    ("open", lambda dataset, directory: open_dataset(directory, MODE)),
+    ("indexes", lambda dataset, directory: build_indexes(dataset.data)),
+    ("filter/sort", lambda dataset, directory: _filter_sort(dataset)),
+    ("weekly grouping", lambda dataset, directory: _weekly_grouping(dataset)),
+    ("text index", lambda dataset, directory: _text_indexes(dataset)),
+    ("search", lambda dataset, directory: _search(dataset)),
+    ("statistics", lambda dataset, directory: _statistics(dataset)),
+    ("figures", lambda dataset, directory: _figures(dataset)),
+]
+
+
+# Best wall time of REPEAT calls, in seconds
+def best_time(function, *args):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# {case: seconds} for a history of the given size
+def run(size):
+    n_reports, n_todos = SIZES[size]
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic(os.path.join(directory, "thesis_data.json"), n_reports, n_todos)
+        dataset = open_dataset(directory, MODE)
+        return {name: best_time(case, dataset, directory) for name, case in CASES}
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES):
+        return {}
+    with open(BASELINES, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Names of the cases that regressed against baselines
+def regressions(results, baselines):
+    return [
+        name
+        for name, seconds in results.items()
+        if name in baselines
+        and seconds > baselines[name] * TOLERANCE
+        and seconds - baselines[name] > NOISE
+    ]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data layer.")
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument(
+        "--record", action="store_true", help="store the results as the baselines"
+    )
+    args = parser.parse_args(args)
+
+    results = run(args.size)
+    all_baselines = load_baselines()
+    baselines = all_baselines.get(args.size, {})
+    slow = regressions(results, baselines)
+
+    n_reports, n_todos = SIZES[args.size]
+    print(f"{args.size}: {n_reports} reports, {n_todos} to-dos, best of {REPEAT}")
+    print(f"{'case':<18}{'time (s)':>10}{'baseline (s)':>14}{'ratio':>8}")
+    for name, seconds in results.items():
+        if name in baselines:
+            ratio = seconds / baselines[name]
+            compared = f"{baselines[name]:>14.4f}{ratio:>8.2f}"
+        else:
+            compared = f"{'-':>14}{'-':>8}"
+        flag = "  REGRESSION" if name in slow else ""
+        print(f"{name:<18}{seconds:>10.4f}{compared}{flag}")
+
+    if args.record:
+        all_baselines[args.size] = {
+            name: round(seconds, 6) for name, seconds in results.items()
+        }
+        ordered = {size: all_baselines[size] for size in SIZES if size in all_baselines}
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump(ordered, f, indent=4)
+            f.write("\n")
+        print(f"Recorded the baselines of {args.size} in {BASELINES}")
+    elif slow:
+        print(f"{len(slow)} regression(s) over {TOLERANCE}x the baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
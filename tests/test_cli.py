@@ -0,0 +1,68 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from thesis_tracker import cli
+from thesis_tracker.dataset import open_dataset
+
+
+def row(when, note):
+    return json.dumps(
+        {
+            "collection": "reports",
+            "date": when,
+            "category": "Writing",
+            "task": "Draft",
+            "time_spent": 1,
+            "result_rating": 3,
+            "focus_rating": 4,
+            "note": note,
+        }
+    )
+
+
+class SlowInput(io.StringIO):
+    """Stdin during which another session saves its changes."""
+
+    def __init__(self, text, while_read):
+        super().__init__(text)
+        self.while_read = while_read
+
+    def __iter__(self):
+        self.while_read()
+        return super().__iter__()
+
+
+@pytest.mark.parametrize("mode", ["journal", "json", "sqlite"])
+def test_add_keeps_changes_saved_meanwhile(tmp_path, monkeypatch, mode):
+    app = open_dataset(str(tmp_path), mode)
+    app.update("set", ["categories"], ["Writing"])
+
+    def save_in_app():
+        app.update("set", ["progress", "Results"], 60)
+        app.add_report(
+            {
+                "date": datetime(2024, 8, 5, 10),
+                "category": "Writing",
+                "task": "Draft",
+                "time_spent": 1,
+                "result_rating": 3,
+                "focus_rating": 4,
+                "note": "app",
+            }
+        )
+
+    lines = [row("2024-08-05T10:00:00", "app"), row("2024-08-06T10:00:00", "cli")]
+    monkeypatch.setattr("sys.stdin", SlowInput("\n".join(lines) + "\n", save_in_app))
+    argv = ["--dir", str(tmp_path), "--storage", mode, "add", "reports"]
+    assert cli.main(argv + ["--format", "ndjson"]) == 0
+
+    loaded = open_dataset(str(tmp_path), mode)
+    assert loaded.data["progress"] == {"Results": 60}
+    # The report the app saved while the input was read is a duplicate
+    assert sorted(r.note for r in loaded.data["reports"]) == ["app", "cli"]
+    assert loaded.data["tasks"] == ["Draft"]
+    app.refresh()
+    assert sorted(r.note for r in app.data["reports"]) == ["app", "cli"]
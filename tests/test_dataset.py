@@ -0,0 +1,115 @@
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from thesis_tracker.dataset import open_dataset
+from thesis_tracker.importer import import_data
+from thesis_tracker.storage import StaleDataError
+
+
+def report(report_id, when, note=""):
+    return {
+        "id": report_id,
+        "date": when,
+        "category": "Writing",
+        "task": "Draft",
+        "time_spent": 1,
+        "result_rating": 3,
+        "focus_rating": 4,
+        "note": note,
+    }
+
+
+def upload(reports, existing=None):
+    text = json.dumps({"reports": reports})
+    return import_data(io.StringIO(text), existing=existing).data
+
+
+@pytest.mark.parametrize("mode", ["journal", "json", "sqlite"])
+def test_merge_keeps_changes_of_other_processes(tmp_path, mode):
+    mine = open_dataset(str(tmp_path), mode)
+    theirs = open_dataset(str(tmp_path), mode)
+    theirs.add_report(report(None, datetime(2024, 8, 5, 10), "theirs"))
+    theirs.update("set", ["progress", "Results"], 77)
+
+    mine.merge(upload([report("r1", "2024-08-06T10:00:00", "mine")], mine.data))
+    assert mine.data["progress"] == {"Results": 77}
+    assert sorted(r.note for r in mine.data["reports"]) == ["mine", "theirs"]
+    assert mine.rollups.totals()[3] == 2
+
+    loaded = open_dataset(str(tmp_path), mode)
+    assert loaded.data["progress"] == {"Results": 77}
+    assert sorted(r.note for r in loaded.data["reports"]) == ["mine", "theirs"]
+    theirs.refresh()
+    assert sorted(r.note for r in theirs.data["reports"]) == ["mine", "theirs"]
+
+
+def test_aware_dates_are_stored_naive(tmp_path):
+    dataset = open_dataset(str(tmp_path), "journal")
+    dataset.add_report(report(None, datetime(2024, 8, 5, 10), "naive"))
+    reports = [report("r1", "2024-08-06T10:00:00+02:00", "aware")]
+    dataset.merge(upload(reports, dataset.data))
+    dataset.update(
+        "append", ["reports"], report("r2", "2024-08-07T09:00:00Z", "journal")
+    )
+
+    for loaded in [dataset, open_dataset(str(tmp_path), "journal")]:
+        assert all(r.date.tzinfo is None for r in loaded.data["reports"])
+        index = loaded.indexes["reports"]
+        # All three fall in one week and are sorted together
+        assert len(index.week_reports(index.newest_weeks()[0])) == 3
+
+
+class ManualWriter:
+    def schedule(self, dataset):
+        pass
+
+
+def test_rejected_changes_are_kept_for_their_session(tmp_path):
+    mine = open_dataset(str(tmp_path), "journal", ManualWriter())
+    theirs = open_dataset(str(tmp_path), "journal")
+    theirs.add_report(report(None, datetime(2024, 8, 5, 10)))
+    mine.refresh()
+    report_id = mine.data["reports"][0].id
+    theirs.remove_report(report_id)
+
+    mine.update("set", ["reports", report_id, "note"], "lost", session="a")
+    mine.update("set", ["progress", "Results"], 50, session="b")
+    mine.flush()
+    assert mine.data["reports"] == []
+    assert mine.take_rejected("b") == []
+    assert [c["path"] for c in mine.take_rejected("a")] == [
+        ["reports", report_id, "note"]
+    ]
+    # Reported once
+    assert mine.take_rejected("a") == []
+    assert mine.rejected == {}
+
+
+@pytest.mark.parametrize("mode", ["journal", "json", "sqlite"])
+@pytest.mark.parametrize("writer", [None, ManualWriter()])
+def test_name_lists_are_changed_by_value(tmp_path, mode, writer):
+    mine = open_dataset(str(tmp_path), mode, writer)
+    mine.update("set", ["categories"], ["A", "B", "C", "D"])
+    mine.flush()
+    theirs = open_dataset(str(tmp_path), mode)
+    theirs.update("discard", ["categories"], "A")
+
+    mine.update("discard", ["categories"], "C")
+    mine.flush()
+    assert mine.data["categories"] == ["B", "D"]
+    assert open_dataset(str(tmp_path), mode).data["categories"] == ["B", "D"]
+
+    # A name another session removed already is stale
+    theirs.refresh()
+    theirs.update("discard", ["categories"], "B")
+    if writer is None:
+        with pytest.raises(StaleDataError):
+            mine.update("discard", ["categories"], "B")
+    else:
+        mine.update("discard", ["categories"], "B", session="s")
+        mine.flush()
+        assert len(mine.take_rejected("s")) == 1
+    assert mine.data["categories"] == ["D"]
@@ -0,0 +1,115 @@
+import gzip
+import io
+import json
+from datetime import date
+
+import pytest
+
+from thesis_tracker.exporter import (
+    FORMATS,
+    export_bytes,
+    iter_export,
+    parquet_available,
+)
+from thesis_tracker.importer import import_data, import_rows
+from thesis_tracker.synthetic import synthetic_data
+
+# (start, end, categories) of the export page's filters
+FILTERS = [
+    (None, None, ()),
+    (date(2023, 3, 1), date(2023, 9, 30), ()),
+    (None, date(2023, 6, 1), ["Writing", "Meetings"]),
+    (date(2030, 1, 1), None, ()),
+]
+
+
+@pytest.fixture(scope="module")
+def data():
+    return synthetic_data(600, 200)
+
+
+# Reports and to-dos an export with the filters must contain, by scanning
+def selected(data, start, end, categories):
+    def keep(record, day):
+        return (
+            (not categories or record.category in categories)
+            and (start is None or day >= start)
+            and (end is None or day <= end)
+        )
+
+    return (
+        [r for r in data["reports"] if keep(r, r.date.date())],
+        [t for t in data["todo"] if keep(t, t.due_date)],
+    )
+
+
+@pytest.mark.parametrize("start, end, categories", FILTERS)
+def test_json_export_imports_the_selection(data, start, end, categories):
+    reports, todos = selected(data, start, end, categories)
+    raw = export_bytes(data, "json", start, end, categories)
+    result = import_data(io.StringIO(raw.decode("utf-8")))
+    assert result.errors == []
+    assert result.data["reports"] == reports
+    assert result.data["todo"] == todos
+    assert result.data["progress"] == data["progress"]
+    for key in ["categories", "tasks", "tags"]:
+        assert result.data[key] == data[key]
+
+
+@pytest.mark.parametrize("start, end, categories", FILTERS)
+def test_ndjson_and_csv_exports_import_the_selection(data, start, end, categories):
+    reports, todos = selected(data, start, end, categories)
+    for key, expected in [("reports", reports), ("todo", todos)]:
+        for fmt in ["ndjson", f"{key}.csv"]:
+            raw = export_bytes(data, fmt, start, end, categories)
+            text = io.StringIO(raw.decode("utf-8"), newline="")
+            result = import_rows(text, key, fmt.rsplit(".", 1)[-1])
+            assert result.errors == []
+            assert result.data[key] == expected, fmt
+
+
+def test_ndjson_lines_are_tagged(data):
+    lines = export_bytes(data, "ndjson").decode("utf-8").splitlines()
+    collections = [json.loads(line)["collection"] for line in lines]
+    expected = (
+        len(data["progress"])
+        + sum(len(data[key]) for key in ["categories", "tasks", "tags"])
+        + len(data["reports"])
+        + len(data["todo"])
+    )
+    assert len(lines) == expected
+    assert set(collections) == {
+        "progress",
+        "categories",
+        "tasks",
+        "tags",
+        "reports",
+        "todo",
+    }
+
+
+@pytest.mark.parametrize("fmt", [f for f in FORMATS if f != "reports.parquet"])
+def test_gzip_matches_the_plain_export(data, fmt):
+    plain = export_bytes(data, fmt)
+    assert gzip.decompress(export_bytes(data, fmt, compress=True)) == plain
+    # JSON is handed out a record at a time, CSV every 64 KB
+    if fmt in ["json", "ndjson"]:
+        assert len(list(iter_export(data, fmt))) > len(data["reports"])
+
+
+@pytest.mark.skipif(not parquet_available(), reason="needs pyarrow or fastparquet")
+@pytest.mark.parametrize("start, end, categories", FILTERS)
+def test_parquet_holds_the_selected_reports(data, start, end, categories):
+    import pandas as pd
+
+    reports, _ = selected(data, start, end, categories)
+    raw = export_bytes(data, "reports.parquet", start, end, categories)
+    frame = pd.read_parquet(io.BytesIO(raw))
+    assert list(frame["id"]) == [r.id for r in reports]
+    assert [t.to_pydatetime() for t in frame["date"]] == [r.date for r in reports]
+    assert list(frame["time_spent"]) == [r.time_spent for r in reports]
+
+
+def test_unknown_format(data):
+    with pytest.raises(ValueError):
+        export_bytes(data, "xml")
@@ -0,0 +1,101 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from thesis_tracker.gantt import LEVELS, _aggregate, gantt_bars, period, task_span
+from thesis_tracker.records import TodoTask
+
+# Calendar key of the period of each level, computed independently
+PERIOD_KEYS = {
+    "week": lambda day: day.isocalendar()[:2],
+    "month": lambda day: (day.year, day.month),
+    "quarter": lambda day: (day.year, (day.month - 1) // 3),
+    "year": lambda day: day.year,
+}
+
+
+@pytest.mark.parametrize("level", LEVELS[1:])
+def test_periods_tile_the_calendar(level):
+    key = PERIOD_KEYS[level]
+    day = date(2023, 11, 20)
+    while day < date(2026, 2, 10):
+        first, following = period(day, level)
+        assert first <= day < following
+        assert key(first) == key(day) != key(following)
+        assert key(first - timedelta(days=1)) != key(day)
+        # The next period starts where this one ends
+        assert period(following, level)[0] == following
+        day += timedelta(days=1)
+
+
+def todos(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        TodoTask.from_dict(
+            {
+                "id": f"t{i}",
+                "name": f"Task {i}",
+                "category": rng.choice(["Writing", "Research", "Meetings"]),
+                "priority": "High",
+                "due_date": date(2024, 1, 1) + timedelta(days=rng.randrange(400)),
+                "estimated_time": rng.choice([0, 4, 8, 20, 80]),
+                "completed": rng.random() < 0.3,
+            }
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("level", LEVELS[1:])
+def test_aggregate_matches_grouping(level):
+    tasks = todos(500)
+    expected = {}
+    for todo in tasks:
+        group = (todo.category, PERIOD_KEYS[level](todo.due_date))
+        count, hours = expected.get(group, (0, 0))
+        expected[group] = (count + 1, hours + todo.estimated_time)
+    bars = _aggregate(tasks, level)
+    actual = {
+        (bar["Category"], PERIOD_KEYS[level](bar["Start"])): (
+            bar["Tasks"],
+            bar["Hours"],
+        )
+        for bar in bars
+    }
+    assert len(bars) == len(actual)
+    assert actual == expected
+    for bar in bars:
+        assert (bar["Start"], bar["Finish"]) == period(bar["Start"], level)
+
+
+def visible(tasks, start, end, include_completed):
+    return [
+        todo
+        for todo in tasks
+        if (include_completed or not todo.completed)
+        and (start is None or task_span(todo)[1] >= start)
+        and (end is None or task_span(todo)[0] <= end)
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [(None, None), (date(2024, 3, 1), date(2024, 3, 20)), (date(2024, 6, 1), None)],
+)
+@pytest.mark.parametrize("include_completed", [True, False])
+@pytest.mark.parametrize("max_bars", [5, 40, 1000])
+def test_gantt_bars_pick_the_finest_level_that_fits(
+    start, end, include_completed, max_bars
+):
+    tasks = todos(300, seed=1)
+    expected = visible(tasks, start, end, include_completed)
+    level, bars = gantt_bars(tasks, start, end, include_completed, max_bars)
+    assert sum(bar["Tasks"] for bar in bars) == len(expected)
+    if len(expected) <= max_bars:
+        assert level == "task"
+        assert [bar["Task"] for bar in bars] == [todo.name for todo in expected]
+        return
+    fitting = [lvl for lvl in LEVELS[1:] if len(_aggregate(expected, lvl)) <= max_bars]
+    assert level == (fitting[0] if fitting else "year")
+    assert len(bars) == len(_aggregate(expected, level))
@@ -0,0 +1,124 @@
+import itertools
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from thesis_tracker.indexes import PRIORITY_ORDER, SORT_KEYS, build_indexes
+from thesis_tracker.records import type_records
+from thesis_tracker.sqlite_storage import SqliteStorage
+from thesis_tracker.storage import apply_change, empty_data
+
+CATEGORIES = ["Writing", "Research", "Meetings"]
+PRIORITIES = list(PRIORITY_ORDER)
+TAGS = ["Important", "Urgent", "Long-term"]
+
+
+def todo(rng, todo_id):
+    return {
+        "id": todo_id,
+        "name": todo_id,
+        "category": rng.choice(CATEGORIES),
+        "priority": rng.choice(PRIORITIES),
+        "due_date": (date(2024, 8, 1) + timedelta(days=rng.randrange(10))).isoformat(),
+        "estimated_time": rng.choice([1, 2, 3]),
+        "tags": rng.sample(TAGS, rng.randint(0, 2)),
+    }
+
+
+# Random appends, field changes and removals, as the To-Do page makes them
+def random_changes(rng, data, n):
+    ids = [t["id"] for t in data["todo"]]
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.2 or not ids:
+            value = todo(rng, f"n{i}")
+            ids.append(value["id"])
+            yield {"op": "append", "path": ["todo"], "value": value}
+        elif roll < 0.3:
+            todo_id = ids.pop(rng.randrange(len(ids)))
+            yield {"op": "remove", "path": ["todo", todo_id]}
+        else:
+            todo_id = rng.choice(ids)
+            field, value = rng.choice(
+                [
+                    ("category", rng.choice(CATEGORIES)),
+                    ("priority", rng.choice(PRIORITIES)),
+                    ("tags", rng.sample(TAGS, rng.randint(0, 2))),
+                    ("due_date", date(2024, 8, 1) + timedelta(days=rng.randrange(10))),
+                    ("estimated_time", rng.choice([1, 2, 3])),
+                    ("notes", "changed"),
+                ]
+            )
+            yield {"op": "set", "path": ["todo", todo_id, field], "value": value}
+
+
+# Filter and sort by scanning the list; sorting is stable, so equal keys keep
+# the stored order
+def brute_filter(todos, categories=(), priorities=(), tags=(), sort_by=None):
+    matching = [
+        t
+        for t in todos
+        if (not categories or t.category in categories)
+        and (not priorities or t.priority in priorities)
+        and (not tags or set(t.tags) & set(tags))
+    ]
+    if sort_by in SORT_KEYS:
+        matching.sort(key=SORT_KEYS[sort_by])
+    return matching
+
+
+# Filter combinations of the To-Do page, few and many matches
+FILTERS = [
+    ((), (), ()),
+    (["Writing"], (), ()),
+    (["Writing", "Research"], ["High"], ()),
+    ((), ["Low", "Medium"], ["Urgent"]),
+    (["Meetings"], ["High"], ["Important", "Long-term"]),
+    ((), (), ["Nothing"]),
+]
+
+
+@pytest.fixture
+def data():
+    rng = random.Random(7)
+    data = empty_data()
+    data["todo"] = [todo(rng, f"t{i}") for i in range(120)]
+    return type_records(data)
+
+
+def test_filters_and_orderings_follow_changes(data):
+    rng = random.Random(8)
+    indexes = build_indexes(data)
+    stored = list(data["todo"])
+    for sort_by in [None, *SORT_KEYS]:
+        indexes["todo"].filter(sort_by=sort_by)
+    assert data["todo"] == stored
+
+    for change in random_changes(rng, data, 300):
+        apply_change(data, change, indexes)
+        if rng.random() < 0.1:
+            check_filters(indexes["todo"], data["todo"])
+    check_filters(indexes["todo"], data["todo"])
+
+
+def check_filters(index, todos):
+    for filters, sort_by in itertools.product(FILTERS, [None, *SORT_KEYS]):
+        expected = [t.id for t in brute_filter(todos, *filters, sort_by)]
+        assert [t.id for t in index.filter(*filters, sort_by)] == expected
+
+
+def test_sqlite_filters_match_the_index(tmp_path, data):
+    backend = SqliteStorage(
+        str(tmp_path / "thesis_data.sqlite3"), str(tmp_path / "thesis_data.json")
+    )
+    backend.save(data)
+    data = backend.load()
+    indexes = build_indexes(data)
+    rng = random.Random(9)
+    for change in random_changes(rng, data, 100):
+        backend.record(data, change, indexes)
+    for filters, sort_by in itertools.product(FILTERS, [None, *SORT_KEYS]):
+        expected = [t.id for t in brute_filter(data["todo"], *filters, sort_by)]
+        todos = backend.filter_todos(indexes["todo"], *filters, sort_by)
+        assert [t.id for t in todos] == expected
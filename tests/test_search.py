@@ -0,0 +1,193 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from thesis_tracker.indexes import build_indexes
+from thesis_tracker.records import type_records
+from thesis_tracker.search import MIN_PREFIX, PREFIX_WEIGHT, TextIndex, tokenize
+from thesis_tracker.storage import apply_change, empty_data
+
+WORDS = ["method", "methodology", "meta", "insight", "insights", "in", "a", "ab"]
+
+
+def text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+
+
+# Scores by checking every document against every query word
+def brute_scores(docs, query, within=None):
+    weights = {}
+    for doc_id, fields in docs.items():
+        weights[doc_id] = {}
+        for field_text, weight in fields:
+            for token in tokenize(field_text):
+                weights[doc_id][token] = weights[doc_id].get(token, 0) + weight
+    frequency = {}
+    for tokens in weights.values():
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+    n = len(docs)
+    scores = {}
+    for doc_id, tokens in weights.items():
+        if within is not None and doc_id not in within:
+            continue
+        total = 0
+        for word in set(tokenize(query)):
+            best = 0
+            for token, weight in tokens.items():
+                if token == word:
+                    factor = 1
+                elif len(word) >= MIN_PREFIX and token.startswith(word):
+                    factor = PREFIX_WEIGHT
+                else:
+                    continue
+                idf = math.log(1 + n / frequency[token])
+                best = max(best, weight * idf * factor)
+            if not best:
+                break
+            total += best
+        else:
+            if query.strip():
+                scores[doc_id] = total
+    return scores
+
+
+def assert_scores(actual, expected):
+    assert actual.keys() == expected.keys()
+    for doc_id, score in expected.items():
+        assert actual[doc_id] == pytest.approx(score)
+
+
+def test_scores_match_brute_force():
+    rng = random.Random(1)
+    index, docs = TextIndex(), {}
+    for i in range(200):
+        docs[i] = [(text(rng), 2), (text(rng), 1)]
+        index.add(i, docs[i])
+    within = set(rng.sample(sorted(docs), 50))
+    for query in ["meth", "methodology", "in", "ins meta", "a", "ab", "m", "zzz"]:
+        assert_scores(index.scores(query), brute_scores(docs, query))
+        assert_scores(index.scores(query, within), brute_scores(docs, query, within))
+
+
+def test_short_words_match_whole_tokens_only():
+    index = TextIndex()
+    index.add("apple", [("apple pie", 1)])
+    index.add("a", [("a pie", 1)])
+    assert index.search("a") == (["a"], 1)
+    assert sorted(index.search("ap")[0]) == ["apple"]
+
+
+def test_ranking():
+    index = TextIndex()
+    index.add("prefix", [("methodology", 1)])
+    index.add("old", [("method", 1)])
+    index.add("note", [("x", 2), ("method", 1)])
+    index.add("title", [("method", 2)])
+    index.add("new", [("method", 1)])
+    ids, total = index.search("method")
+    assert total == 5
+    # "methodology" is rare enough to outweigh the prefix factor; equal
+    # scores keep newer documents first
+    assert ids == ["title", "prefix", "new", "note", "old"]
+    assert index.search("method", limit=2) == (["title", "prefix"], 5)
+
+
+def test_updates_match_a_fresh_index():
+    rng = random.Random(2)
+    index, docs = TextIndex(), {}
+    index.vocabulary  # keep the sorted vocabulary up to date from the start
+    for step in range(500):
+        doc_id = rng.randrange(60)
+        if doc_id in docs and rng.random() < 0.4:
+            index.remove(doc_id)
+            del docs[doc_id]
+        else:
+            # Words unique to a version of a document leave the vocabulary with it
+            docs[doc_id] = [(f"{text(rng)} v{step}", rng.choice([1, 2]))]
+            index.add(doc_id, docs[doc_id])
+    assert index.vocabulary == sorted(index.postings)
+    for query in ["meth", "insight", "in a", "ab", "v1", "v49"]:
+        assert_scores(index.scores(query), brute_scores(docs, query))
+
+
+def report(report_id, day, task, note):
+    return {
+        "id": report_id,
+        "date": datetime(2024, 1, 1) + timedelta(days=day),
+        "category": "Writing",
+        "task": task,
+        "time_spent": 1,
+        "result_rating": 3,
+        "focus_rating": 3,
+        "note": note,
+    }
+
+
+def todo(todo_id, name, notes, steps):
+    return {
+        "id": todo_id,
+        "name": name,
+        "category": "Writing",
+        "priority": "High",
+        "due_date": "2024-02-01",
+        "estimated_time": 1,
+        "notes": notes,
+        "steps": [{"step": step} for step in steps],
+    }
+
+
+# The documents of the records of a collection, as the index sees them
+def record_docs(index):
+    return {record.id: index.text_fields(record) for record in index.by_id.values()}
+
+
+def test_record_indexes_follow_changes():
+    rng = random.Random(3)
+    data = empty_data()
+    data["reports"] = [report(f"r{i}", i, text(rng), text(rng)) for i in range(30)]
+    data["todo"] = [todo(f"t{i}", text(rng), text(rng), [text(rng)]) for i in range(30)]
+    type_records(data)
+    indexes = build_indexes(data)
+    for index in indexes.values():
+        index.text  # build the full-text indexes before the changes
+    changes = []
+    for i in range(30, 60):
+        changes.append(
+            {
+                "op": "append",
+                "path": ["reports"],
+                "value": report(f"r{i}", i, text(rng), text(rng)),
+            }
+        )
+        changes.append(
+            {"op": "set", "path": ["reports", f"r{i - 30}", "note"], "value": text(rng)}
+        )
+        changes.append(
+            {"op": "set", "path": ["todo", f"t{i - 30}", "name"], "value": text(rng)}
+        )
+        changes.append(
+            {
+                "op": "append",
+                "path": ["todo", f"t{i - 30}", "steps"],
+                "value": {"step": text(rng)},
+            }
+        )
+        if i % 3 == 0:
+            changes.append({"op": "remove", "path": ["reports", f"r{i - 30}"]})
+            changes.append({"op": "remove", "path": ["todo", f"t{i - 30}"]})
+    for change in changes:
+        apply_change(data, change, indexes)
+
+    for name, index in indexes.items():
+        docs = record_docs(index)
+        assert set(docs) == {record.id for record in data[name]}
+        for query in ["meth", "insights", "in meta", "ab"]:
+            records, total = index.search(query)
+            expected = brute_scores(docs, query)
+            assert total == len(expected)
+            assert {record.id for record in records} == set(expected)
+            scores = [expected[record.id] for record in records]
+            assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,177 @@
+import threading
+
+import pytest
+
+from thesis_tracker import storage
+from thesis_tracker.indexes import build_indexes
+from thesis_tracker.records import type_records
+from thesis_tracker.sqlite_storage import SqliteStorage
+from thesis_tracker.storage import JournalStorage, JsonStorage, StaleDataError
+
+
+def todo(todo_id, name):
+    return {
+        "id": todo_id,
+        "name": name,
+        "category": "Writing",
+        "priority": "High",
+        "due_date": "2024-08-20",
+        "estimated_time": 2,
+    }
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "thesis_data.json")
+    data = storage.empty_data()
+    data["todo"] = [todo("t1", "Draft"), todo("t2", "Revise")]
+    JournalStorage(path).save(type_records(data))
+    return path
+
+
+def change(op, path, value=None):
+    return {"op": op, "path": path, "value": value}
+
+
+def test_replay_after_crash(path):
+    backend = JournalStorage(path)
+    data = backend.load()
+    backend.record(data, change("set", ["todo", "t1", "notes"], "first"))
+    backend.record(data, change("set", ["progress", "Results"], 40))
+    backend.record(data, {"op": "remove", "path": ["todo", "t2"]})
+    # The process dies before the journal is folded; a new one replays it
+    loaded = JournalStorage(path).load()
+    assert [t.id for t in loaded["todo"]] == ["t1"]
+    assert loaded["todo"][0].notes == "first"
+    assert loaded["progress"] == {"Results": 40}
+    assert loaded["version"] == data["version"]
+
+
+def test_truncated_last_line(path):
+    backend = JournalStorage(path)
+    data = backend.load()
+    backend.record(data, change("set", ["todo", "t1", "notes"], "kept"))
+    with open(backend.journal_path, "ab") as f:
+        f.write(b'{"op":"set","path":["todo","t2","no')
+    loaded = JournalStorage(path).load()
+    assert loaded["todo"][0].notes == "kept"
+    assert loaded["todo"][1].notes == ""
+
+    # Entries appended after the partial line start on a line of their own
+    backend.record(data, change("set", ["todo", "t2", "notes"], "after"))
+    loaded = JournalStorage(path).load()
+    assert [t.notes for t in loaded["todo"]] == ["kept", "after"]
+
+
+def test_rebase_with_deleted_record(path):
+    mine, theirs = JournalStorage(path), JournalStorage(path)
+    data, other = mine.load(), theirs.load()
+    theirs.record(other, {"op": "remove", "path": ["todo", "t1"]})
+
+    changes = [
+        change("set", ["todo", "t1", "notes"], "lost"),
+        change("set", ["todo", "t2", "notes"], "kept"),
+    ]
+    for c in changes:
+        storage.apply_change(data, c)
+    refreshed, rejected = mine.persist(data, changes)
+    assert refreshed
+    assert rejected == [changes[0]]
+    assert [(t.id, t.notes) for t in data["todo"]] == [("t2", "kept")]
+    assert JournalStorage(path).load()["todo"] == data["todo"]
+
+    # A single change to the deleted record is refused
+    with pytest.raises(StaleDataError):
+        theirs.record(other, change("set", ["todo", "t1", "notes"], "gone"))
+
+
+def test_concurrent_append_and_compaction(path, monkeypatch):
+    # Fold the journal into the snapshot every few entries
+    monkeypatch.setattr(storage, "JOURNAL_MAX_BYTES", 300)
+    per_writer = 40
+
+    def write(name):
+        backend = JournalStorage(path)
+        data = backend.load()
+        for i in range(per_writer):
+            backend.record(data, change("append", ["tags"], f"{name}{i}"))
+
+    threads = [threading.Thread(target=write, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    backend = JournalStorage(path)
+    # The journal was folded into the snapshot along the way
+    assert backend.journal_size() <= storage.JOURNAL_MAX_BYTES
+    loaded = backend.load()
+    for name in "ab":
+        assert [t for t in loaded["tags"] if t.startswith(name)] == [
+            f"{name}{i}" for i in range(per_writer)
+        ]
+    assert loaded["version"] >= 2 * per_writer
+
+
+def test_save_refuses_stale_data(path):
+    mine, theirs = JournalStorage(path), JournalStorage(path)
+    data, other = mine.load(), theirs.load()
+    theirs.record(other, change("set", ["progress", "Results"], 77))
+    with pytest.raises(StaleDataError):
+        mine.save(data)
+    assert JournalStorage(path).load()["progress"] == {"Results": 77}
+
+    # Data that was not loaded from the files replaces everything
+    fresh = storage.empty_data()
+    fresh["tags"] = ["imported"]
+    mine.save(fresh)
+    assert JournalStorage(path).load()["tags"] == ["imported"]
+
+
+def test_marks_are_pruned(path):
+    backend = JsonStorage(path)
+    data = backend.load()
+    for i in range(20):
+        backend.record(data, change("set", ["progress", "Results"], i))
+    assert list(backend._marks) == [data["version"]]
+
+
+def test_sqlite_record_of_deleted_row(tmp_path):
+    db = str(tmp_path / "thesis_data.sqlite3")
+    json_path = str(tmp_path / "thesis_data.json")
+    data = storage.empty_data()
+    data["todo"] = [todo("t1", "Draft"), todo("t2", "Revise")]
+    SqliteStorage(db, json_path).save(type_records(data))
+
+    mine, theirs = SqliteStorage(db, json_path), SqliteStorage(db, json_path)
+    data, other = mine.load(), theirs.load()
+    theirs.record(other, {"op": "remove", "path": ["todo", "t1"]})
+    with pytest.raises(StaleDataError):
+        mine.record(data, change("set", ["todo", "t1", "notes"], "lost"))
+    assert [t.id for t in data["todo"]] == ["t2"]
+
+    assert mine.record(data, change("set", ["todo", "t2", "notes"], "kept")) is False
+    assert [t.notes for t in theirs.load()["todo"]] == ["kept"]
+
+    # A deletion the refresh does not see yet, e.g. made within the same
+    # timestamp tick, is caught when the row is written
+    theirs.record(theirs.load(), {"op": "remove", "path": ["todo", "t2"]})
+    mine._stamp = mine._file_stamp()
+    with pytest.raises(StaleDataError):
+        mine.record(data, change("set", ["todo", "t2", "notes"], "lost"))
+    assert data["todo"] == []
+
+
+def test_sqlite_filter_todos_skips_rows_saved_meanwhile(tmp_path):
+    db = str(tmp_path / "thesis_data.sqlite3")
+    json_path = str(tmp_path / "thesis_data.json")
+    data = storage.empty_data()
+    data["todo"] = [todo("t1", "Draft")]
+    SqliteStorage(db, json_path).save(type_records(data))
+
+    mine, theirs = SqliteStorage(db, json_path), SqliteStorage(db, json_path)
+    data, other = mine.load(), theirs.load()
+    indexes = build_indexes(data)
+    theirs.record(other, change("append", ["todo"], todo("x1", "Outline")))
+    todos = mine.filter_todos(indexes["todo"], sort_by="Due Date")
+    assert [t.id for t in todos] == ["t1"]
@@ -0,0 +1,41 @@
+"""Data layer of the Thesis Tracker app.
+
+The data and analytics logic works without Streamlit, e.g. in scripts and the
+benchmarks::
+
+    from thesis_tracker import charts, gantt_bars, open_dataset
+
+    dataset = open_dataset("path/to/data")  # directory of thesis_data.json
+    todos = dataset.indexes["todo"].filter(categories=["Writing"], sort_by="Due Date")
+    weeks = dataset.indexes["reports"].newest_weeks()
+    reports, total = dataset.search("reports", "methodology insig", limit=10)
+    daily = charts.daily_frame(dataset.rollups)
+    level, bars = gantt_bars(dataset.data["todo"])
+
+``thesis_tracker.synthetic`` generates data files of any size for testing.
+"""
+
+from thesis_tracker.dataset import Dataset, open_dataset
+from thesis_tracker.gantt import gantt_bars
+from thesis_tracker.records import Report, Step, TodoTask
+from thesis_tracker.storage import (
+    StaleDataError,
+    create_backend,
+    empty_data,
+    load_data,
+    save_data,
+)
+
+__all__ = [
+    "Dataset",
+    "Report",
+    "StaleDataError",
+    "Step",
+    "TodoTask",
+    "create_backend",
+    "empty_data",
+    "gantt_bars",
+    "load_data",
+    "open_dataset",
+    "save_data",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from thesis_tracker.cli import main
+
+sys.exit(main())
@@ -0,0 +1,73 @@
+"""Chart figures of the pages, built without Streamlit.
+
+The pages cache these figures and hand them to ``st.plotly_chart``; scripts
+and the benchmarks call them directly. pandas and Plotly Express are imported
+when a figure is built, so importing this module stays cheap.
+"""
+
+DAILY_COLUMNS = [
+    "Date",
+    "Time Spent",
+    "Result Rating",
+    "Focus Rating",
+    "Productivity Score",
+]
+PROGRESS_COLORS = ["#FF9999", "#66B2FF", "#99FF99", "#FFCC99", "#FF99CC", "#99CCFF"]
+
+
+# DataFrame of the daily rollups, one row per day with reports
+def daily_frame(rollups):
+    import pandas as pd
+
+    return pd.DataFrame(rollups.daily_stats(), columns=DAILY_COLUMNS)
+
+
+# Line chart of columns of the daily frame over time
+def daily_figure(frame, columns):
+    import plotly.express as px
+
+    fig = px.line(frame, x="Date", y=columns)
+    fig.update_layout(xaxis_title=None, yaxis_title=None)
+    return fig
+
+
+# Pie chart of the time spent per category, given (category, hours) pairs
+def category_figure(category_stats):
+    import pandas as pd
+    import plotly.express as px
+
+    df_category = pd.DataFrame(category_stats, columns=["Category", "Time Spent"])
+    return px.pie(
+        df_category,
+        values="Time Spent",
+        names="Category",
+        title="Time Distribution Across Categories",
+    )
+
+
+# Donut chart of the progress of the thesis sections
+def progress_figure(labels, values, colors=PROGRESS_COLORS):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        data=[go.Pie(labels=labels, values=values, hole=0.3, marker_colors=colors)]
+    )
+    fig.update_layout(title_text="Overall Progress")
+    return fig
+
+
+# Timeline of the bars returned by gantt.gantt_bars
+def gantt_figure(bars):
+    import pandas as pd
+    import plotly.express as px
+
+    fig = px.timeline(
+        pd.DataFrame(bars),
+        x_start="Start",
+        x_end="Finish",
+        y="Task",
+        color="Category",
+        hover_data=["Tasks", "Hours"],
+    )
+    fig.update_yaxes(categoryorder="total ascending")
+    return fig
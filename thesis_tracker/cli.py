@@ -0,0 +1,209 @@
+"""Command-line interface to the thesis data, without Streamlit.
+
+    python -m thesis_tracker add reports --format csv < sessions.csv
+    python -m thesis_tracker add todo --format ndjson < todos.ndjson
+    python -m thesis_tracker stats [--daily] [--json]
+    python -m thesis_tracker weeks [--limit 4] [--json]
+    python -m thesis_tracker export reports.csv --start 2024-01-01 > reports.csv
+
+``--dir`` selects the directory of the data files (the working directory by
+default) and ``--storage`` the storage mode (``THESIS_STORAGE`` by default).
+``add`` reads CSV or NDJSON as written by the export from stdin; records
+already in the data are skipped and invalid ones are reported on stderr, with
+exit status 1. The data is loaded only once the input is read, and the new
+records are appended with one write on top of whatever other processes saved
+meanwhile, so the changes of a running app are kept; the app picks the new
+records up on its next rerun.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from thesis_tracker.dataset import open_dataset
+from thesis_tracker.exporter import FORMATS, iter_export
+from thesis_tracker.importer import import_rows
+from thesis_tracker.indexes import ReportIndex
+from thesis_tracker.storage import create_backend, load_data
+
+# Name list each kind of record adds its task names to, as the app's forms do
+TASK_FIELDS = {"reports": "task", "todo": "name"}
+
+
+def _load(args):
+    return load_data(create_backend(args.storage, args.dir))
+
+
+def add(args):
+    # Reading stdin may take a while, e.g. from a pipe, so the data is loaded
+    # after it and the records are checked against the data as it is then
+    result = import_rows(sys.stdin, args.collection, args.format)
+    dataset = open_dataset(args.dir, args.storage)
+    result.skip_existing(dataset.data)
+    records = result.data[args.collection]
+    # The pages show an emoji per category, so only known categories are taken
+    categories = set(dataset.data["categories"])
+    if categories:
+        for record in records:
+            if record.category not in categories:
+                result.errors.append(
+                    (args.collection, None, f"unknown category {record.category!r}")
+                )
+        records[:] = [record for record in records if record.category in categories]
+    tasks = set(dataset.data["tasks"])
+    for record in records:
+        task = getattr(record, TASK_FIELDS[args.collection])
+        if task not in tasks:
+            tasks.add(task)
+            result.data["tasks"].append(task)
+    if records:
+        dataset.merge(result.data)
+
+    for key, position, message in result.errors:
+        where = f"record {position + 1}" if position is not None else key
+        print(f"{where}: {message}", file=sys.stderr)
+    print(
+        f"Added {len(records)} {args.collection}, skipped {result.duplicates} "
+        f"duplicates and {len(result.errors)} invalid records",
+        file=sys.stderr,
+    )
+    return 1 if result.errors else 0
+
+
+def stats(args):
+    backend = create_backend(args.storage, args.dir)
+    rollups = backend.build_rollups(load_data(backend))
+    total_time, avg_result, avg_focus, report_count = rollups.totals()
+    if args.json:
+        result = {
+            "reports": report_count,
+            "time_spent": total_time,
+            "result_rating": avg_result,
+            "focus_rating": avg_focus,
+            "categories": dict(rollups.category_stats()),
+        }
+        if args.daily:
+            result["daily"] = [
+                {
+                    "date": day.isoformat(),
+                    "time_spent": time_spent,
+                    "result_rating": result_rating,
+                    "focus_rating": focus_rating,
+                    "productivity_score": productivity,
+                }
+                for day, time_spent, result_rating, focus_rating, productivity in (
+                    rollups.daily_stats()
+                )
+            ]
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"Reports: {report_count}")
+    print(f"Total time spent: {total_time:.1f} hours")
+    print(f"Average result rating: {avg_result:.2f}")
+    print(f"Average focus rating: {avg_focus:.2f}")
+    print()
+    print(f"{'Category':<20}{'Hours':>10}")
+    for category, time_spent in rollups.category_stats():
+        print(f"{category:<20}{time_spent:>10.1f}")
+    if args.daily:
+        print()
+        print(f"{'Date':<12}{'Hours':>8}{'Result':>8}{'Focus':>8}{'Score':>8}")
+        for row in rollups.daily_stats():
+            print(f"{row[0].isoformat():<12}" + "".join(f"{v:>8.2f}" for v in row[1:]))
+    return 0
+
+
+# (week start, reports, hours, avg result, avg focus) of the newest weeks
+def _weeks(data, limit=None):
+    index = ReportIndex(data["reports"])
+    for week in index.newest_weeks()[:limit]:
+        reports = index.week_reports(week)
+        n = len(reports)
+        yield (
+            week,
+            n,
+            sum(report.time_spent for report in reports),
+            sum(report.result_rating for report in reports) / n,
+            sum(report.focus_rating for report in reports) / n,
+        )
+
+
+def weeks(args):
+    rows = _weeks(_load(args), args.limit)
+    if args.json:
+        fields = ["week", "reports", "time_spent", "result_rating", "focus_rating"]
+        result = [dict(zip(fields, (row[0].isoformat(), *row[1:]))) for row in rows]
+        print(json.dumps(result, indent=2))
+        return 0
+    print(f"{'Week of':<12}{'Reports':>8}{'Hours':>8}{'Result':>8}{'Focus':>8}")
+    for week, n, hours, result_rating, focus_rating in rows:
+        print(
+            f"{week.isoformat():<12}{n:>8}{hours:>8.1f}"
+            f"{result_rating:>8.2f}{focus_rating:>8.2f}"
+        )
+    return 0
+
+
+def export(args):
+    chunks = iter_export(
+        _load(args), args.format, args.start, args.end, args.category, args.gzip
+    )
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.writelines(chunks)
+    else:
+        sys.stdout.buffer.writelines(chunks)
+    return 0
+
+
+def parser():
+    main_parser = argparse.ArgumentParser(
+        prog="python -m thesis_tracker", description="Work with the thesis data."
+    )
+    main_parser.add_argument("--dir", help="directory of the data files")
+    main_parser.add_argument(
+        "--storage", choices=["journal", "json", "sqlite"], help="storage mode"
+    )
+    commands = main_parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "add", help="add reports or to-dos from CSV/NDJSON on stdin"
+    )
+    command.add_argument("collection", choices=["reports", "todo"])
+    command.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    command.set_defaults(run=add)
+
+    command = commands.add_parser("stats", help="statistics of the reports")
+    command.add_argument("--daily", action="store_true", help="add daily rows")
+    command.add_argument("--json", action="store_true", help="print JSON")
+    command.set_defaults(run=stats)
+
+    command = commands.add_parser("weeks", help="reports grouped by week")
+    command.add_argument("--limit", type=int, help="number of newest weeks")
+    command.add_argument("--json", action="store_true", help="print JSON")
+    command.set_defaults(run=weeks)
+
+    command = commands.add_parser("export", help="export the data to stdout")
+    command.add_argument("format", choices=list(FORMATS))
+    command.add_argument("--start", type=date.fromisoformat, help="first date")
+    command.add_argument("--end", type=date.fromisoformat, help="last date")
+    command.add_argument(
+        "--category", action="append", default=[], help="only this category"
+    )
+    command.add_argument("--gzip", action="store_true", help="gzip-compress")
+    command.add_argument("--output", "-o", help="output file (default: stdout)")
+    command.set_defaults(run=export)
+    return main_parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # The reader, e.g. head, stopped reading; silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
@@ -0,0 +1,215 @@
+"""Typed JSON codec of the data files.
+
+The schema is explicit: reports and todos are the record types of
+``thesis_tracker.records``, whose ``date``/``due_date`` fields hold datetimes
+and dates; everything else is plain JSON. ``loads`` returns the data with the
+records already typed; ``dump``/``dumps`` encode the live records, datetimes
+and dates as they are, without copying, converting or mutating the data first.
+
+The fastest available engine is used: ``msgspec`` or ``orjson`` when
+installed, the standard library otherwise (``THESIS_JSON_ENGINE`` forces one).
+msgspec decodes the record lists straight into records, dates included. The
+other engines parse them into dicts first, which are then turned into records
+with the date fields converted by ``fromisoformat`` instead of ``strptime``;
+so does msgspec for record lists that do not match the schema exactly (e.g.
+dates without a time), whose values are taken as they are.
+
+Files are indented for readability unless ``THESIS_JSON_COMPACT=1``; compact
+files are about 40% smaller and much faster to write with the standard
+library, whose C encoder is not used for indented output; its indented
+output is written by an encoder of its own here, one record at a time. orjson
+can only indent by two spaces, so it always writes compact files rather than
+re-indent a file differently from the other engines. See
+``benchmarks/codec_benchmark.py``.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from json.encoder import encode_basestring_ascii
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from thesis_tracker.records import RECORD_TYPES, Record, type_records
+
+COMPACT = os.environ.get("THESIS_JSON_COMPACT", "") not in ("", "0")
+INDENT = 4
+# Encoded chunks (records, keys, separators) joined per write in dump
+CHUNKS_PER_WRITE = 4096
+
+# Engines usable in this environment, fastest first
+ENGINES = [
+    engine
+    for engine, module in [("msgspec", msgspec), ("orjson", orjson), ("json", json)]
+    if module is not None
+]
+ENGINE = os.environ.get("THESIS_JSON_ENGINE") or ENGINES[0]
+if ENGINE not in ENGINES:
+    raise ValueError(f"JSON engine not available: {ENGINE}")
+
+if msgspec is not None:
+    # Top-level values are decoded one by one, the record lists into records
+    _DOCUMENT = msgspec.json.Decoder(dict[str, msgspec.Raw])
+    _RECORD_LISTS = {
+        key: msgspec.json.Decoder(list[record_type])
+        for key, record_type in RECORD_TYPES.items()
+    }
+
+
+# Fallback for values the engine cannot encode itself
+def encode_fallback(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+_CONSTANTS = {None: "null", True: "true", False: "false"}
+
+
+def _float(value):
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+# Indented JSON of value, as
+# json.dumps(value, default=encode_fallback, indent=INDENT) writes it, at the
+# nesting level of newline ("\n" plus its indentation).
+# The standard library's encoder is pure Python for indented output and calls
+# default for every record and date; this one reads the record fields
+# directly, which is faster and needs no dict per record.
+def _indented(value, newline):
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is None or value is True or value is False:
+        return _CONSTANTS[value]
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return _float(value)
+    inner = newline + " " * INDENT
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return "[]"
+        items = [_indented(item, inner) for item in value]
+        return "[" + inner + ("," + inner).join(items) + newline + "]"
+    if isinstance(value, dict):
+        fields = value.items()
+    elif isinstance(value, Record):
+        fields = [(name, getattr(value, name)) for name in value.keys()]
+    else:
+        return encode_basestring_ascii(encode_fallback(value))
+    if not fields:
+        return "{}"
+    items = [
+        encode_basestring_ascii(str(key)) + ": " + _indented(item, inner)
+        for key, item in fields
+    ]
+    return "{" + inner + ("," + inner).join(items) + newline + "}"
+
+
+# Indented JSON of a data document as chunks, one per list item, so that the
+# file is written as it is encoded
+def _iter_indented(value):
+    if not isinstance(value, dict) or not value:
+        yield _indented(value, "\n")
+        return
+    inner = "\n" + " " * INDENT
+    item_newline = inner + " " * INDENT
+    separator = "{" + inner
+    for key, items in value.items():
+        yield separator + encode_basestring_ascii(str(key)) + ": "
+        separator = "," + inner
+        if not isinstance(items, list) or not items:
+            yield _indented(items, inner)
+            continue
+        iterator = iter(items)
+        yield "[" + item_newline + _indented(next(iterator), item_newline)
+        for item in iterator:
+            yield "," + item_newline + _indented(item, item_newline)
+        yield inner + "]"
+    yield "\n}"
+
+
+def _parse(raw, engine):
+    if engine == "msgspec":
+        return msgspec.json.decode(raw)
+    if engine == "orjson":
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Data of a document with the record lists decoded into records by msgspec;
+# raises msgspec.ValidationError for records that do not match their type
+def _decode_records(raw):
+    data = {}
+    for key, value in _DOCUMENT.decode(raw).items():
+        decoder = _RECORD_LISTS.get(key)
+        if decoder is None:
+            data[key] = msgspec.json.decode(value)
+            continue
+        records = decoder.decode(value)
+        for record in records:
+            record.normalize()
+        data[key] = records
+    return data
+
+
+# Parse a data document (bytes or str) into data holding typed records
+def loads(raw, engine=None):
+    engine = engine or ENGINE
+    if engine == "msgspec":
+        try:
+            return _decode_records(raw)
+        except msgspec.ValidationError:
+            pass
+    return type_records(_parse(raw, engine))
+
+
+# Parse a journal change record; its value is typed when it is applied
+def loads_change(raw):
+    return _parse(raw, ENGINE)
+
+
+# Encode data as UTF-8 JSON into the binary file f. The standard library's
+# indented output is written in batches as it is encoded instead of as one
+# string of the whole file.
+def dump(value, f, compact=COMPACT, engine=None):
+    engine = engine or ENGINE
+    if engine != "json" or compact:
+        f.write(dumps(value, compact, engine))
+        return
+    chunks = []
+    for chunk in _iter_indented(value):
+        chunks.append(chunk)
+        if len(chunks) == CHUNKS_PER_WRITE:
+            f.write("".join(chunks).encode())
+            chunks.clear()
+    f.write("".join(chunks).encode())
+
+
+# Encode data as UTF-8 JSON bytes; compact output is a single line. orjson
+# output is always compact.
+def dumps(value, compact=COMPACT, engine=None):
+    engine = engine or ENGINE
+    if engine == "msgspec":
+        encoded = msgspec.json.encode(value, enc_hook=encode_fallback)
+        return encoded if compact else msgspec.json.format(encoded, indent=INDENT)
+    if engine == "orjson":
+        return orjson.dumps(value, default=encode_fallback)
+    if compact:
+        return json.dumps(
+            value, default=encode_fallback, separators=(",", ":")
+        ).encode()
+    return "".join(_iter_indented(value)).encode()
@@ -0,0 +1,223 @@
+"""The loaded thesis data together with the structures derived from it.
+
+A ``Dataset`` holds the parsed data, its indexes and the statistics rollups,
+and keeps them consistent as changes are made. Its ``revision`` changes
+whenever the data may have changed. The app keeps one ``Dataset`` per process
+and shares it between all sessions, so open tabs use one parsed copy and see
+each other's changes at once. ``refresh`` picks up changes written by other
+processes; it only stats the data files unless they were modified.
+
+The reports need no per-row conversion on a rerun: they are ``Report``
+records whose dates are parsed once on load, the ``ReportIndex`` keeps them
+bucketed by week in date order, and the ``ReportRollups`` keep the daily and
+per-category aggregates of the Statistics page up to date as reports are added
+and removed. pandas is only imported to draw figures from the rollups.
+
+Changes are saved as they are made, or, given a ``BackgroundWriter``, applied
+in memory and saved by the writer a little later, several at a time (see
+``thesis_tracker.writer``).
+"""
+
+import itertools
+import threading
+
+from thesis_tracker import instrumentation
+from thesis_tracker.indexes import build_indexes
+from thesis_tracker.records import Report, type_records
+from thesis_tracker.storage import (
+    StaleDataError,
+    apply_user_change,
+    assign_ids,
+    create_backend,
+    load_data,
+    new_id,
+)
+
+KEYS = ["progress", "reports", "categories", "tasks", "todo", "tags"]
+# Sessions whose rejected changes are kept until they take them
+REJECTED_SESSIONS = 100
+
+# Revisions are unique across datasets, so they can key shared caches
+_revisions = itertools.count()
+
+
+# Dataset of the data files in directory (the working directory by default),
+# stored in mode (THESIS_STORAGE by default)
+def open_dataset(directory=None, mode=None, writer=None):
+    return Dataset(create_backend(mode, directory), writer)
+
+
+class Dataset:
+    """Data, indexes and rollups of one storage backend."""
+
+    def __init__(self, backend, writer=None):
+        self.backend = backend
+        self.writer = writer
+        # Changes applied to the data but not saved yet, when there is a writer
+        self.pending = []
+        # id of a pending change -> session that made it, if given
+        self.origins = {}
+        # session -> its pending changes that no longer applied to the changes
+        # other processes saved meanwhile, and were dropped; see take_rejected
+        self.rejected = {}
+        # Sessions run in threads of the same process
+        self.lock = threading.RLock()
+        self.data = load_data(backend)
+        self._build()
+
+    def _build(self):
+        self.revision = next(_revisions)
+        # Ensure all necessary keys exist
+        for key in KEYS:
+            self.data.setdefault(key, {} if key == "progress" else [])
+        self.indexes = build_indexes(self.data)
+        self._build_rollups()
+
+    def _build_rollups(self):
+        self.rollups = self.backend.build_rollups(self.data)
+
+    # Todos matching all given filters, in the order of sort_by
+    def filter_todos(self, categories=(), priorities=(), tags=(), sort_by=None):
+        index = self.indexes["todo"]
+        with self.lock:
+            if self.pending:
+                # The backend's queries do not see the pending changes yet
+                return index.filter(categories, priorities, tags, sort_by)
+            return self.backend.filter_todos(
+                index, categories, priorities, tags, sort_by
+            )
+
+    # The best limit (or all) reports or todos (collection) matching the words
+    # of query, best first, and the number of all matches. Words match the
+    # words starting with them in report tasks and notes, or todo names, notes
+    # and steps. The full-text index is built on the first search.
+    def search(self, collection, query, limit=None, within=None):
+        with self.lock:
+            return self.indexes[collection].search(query, limit, within)
+
+    # Catch up with changes saved by other processes; returns whether any were
+    def refresh(self):
+        with self.lock:
+            if self.pending and self.backend.changed(self.data):
+                # Saving the pending changes picks up the others' first
+                return self.flush()
+            with instrumentation.timed("refresh"):
+                refreshed = self.backend.refresh(self.data, self.indexes)
+            if refreshed:
+                self.revision = next(_revisions)
+                self._build_rollups()
+            return refreshed
+
+    # Apply a change and persist it; returns whether the data was first
+    # refreshed with changes saved by other processes. Raises StaleDataError
+    # if the change no longer applies after that. With a writer, a change that
+    # is rejected when it is saved is kept for session (see take_rejected).
+    def update(self, op, path, value=None, session=None):
+        change = {"op": op, "path": path}
+        if op != "remove":
+            change["value"] = value
+        with self.lock:
+            # Changes by this or, on a refresh, other sessions make a new revision
+            self.revision = next(_revisions)
+            if self.writer is not None:
+                apply_user_change(self.data, change, self.indexes)
+                self.pending.append(change)
+                if session is not None:
+                    self.origins[id(change)] = session
+                if len(self.pending) == 1:
+                    self.writer.schedule(self)
+                return False
+            try:
+                with instrumentation.timed("record", save=True):
+                    refreshed = self.backend.record(self.data, change, self.indexes)
+            except StaleDataError:
+                self._build_rollups()
+                raise
+            if refreshed:
+                self._build_rollups()
+            return refreshed
+
+    # Save the pending changes; returns whether the data was first refreshed
+    # with changes saved by other processes
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return False
+            changes, self.pending = self.pending, []
+            origins, self.origins = self.origins, {}
+            try:
+                with instrumentation.timed("persist", save=True):
+                    refreshed, rejected = self.backend.persist(
+                        self.data, changes, self.indexes
+                    )
+            except BaseException:
+                self.pending, self.origins = changes, origins
+                raise
+            for change in rejected:
+                session = origins.get(id(change))
+                if session is not None:
+                    self.rejected.setdefault(session, []).append(change)
+            while len(self.rejected) > REJECTED_SESSIONS:
+                del self.rejected[next(iter(self.rejected))]
+            if refreshed:
+                self.revision = next(_revisions)
+                self._build_rollups()
+            return refreshed
+
+    # The changes of session rejected when they were saved, once
+    def take_rejected(self, session):
+        with self.lock:
+            return self.rejected.pop(session, [])
+
+    # Log a report, given as a Report or a dict of its fields
+    def add_report(self, report):
+        report = Report.from_dict(report)
+        report.id = new_id()
+        with self.lock:
+            if not self.update("append", ["reports"], report):
+                self.rollups.add(report)
+
+    # Delete a report by id
+    def remove_report(self, report_id, session=None):
+        with self.lock:
+            report = self.indexes["reports"].by_id.get(report_id)
+            if not self.update("remove", ["reports", report_id], session=session):
+                self.rollups.remove(report)
+
+    # Add the records of new (e.g. an import in merge mode) to the data. They
+    # are saved as append changes with one write, on top of the changes other
+    # processes saved meanwhile.
+    def merge(self, new):
+        type_records(new)
+        assign_ids(new)
+        changes = [
+            {"op": "append", "path": [key], "value": item}
+            for key in KEYS
+            if key != "progress"
+            for item in new.get(key, [])
+        ] + [
+            {"op": "set", "path": ["progress", section], "value": value}
+            for section, value in new.get("progress", {}).items()
+        ]
+        with self.lock:
+            self.revision = next(_revisions)
+            for change in changes:
+                apply_user_change(self.data, change, self.indexes)
+            self.pending.extend(changes)
+            self.flush()
+            self._build_rollups()
+
+    # Replace all data, e.g. with an imported file
+    def replace(self, data):
+        with self.lock:
+            # The new data replaces any changes not saved yet, and whatever
+            # version other sessions saved
+            self.pending = []
+            data.pop("version", None)
+            type_records(data)
+            assign_ids(data)
+            with instrumentation.timed("save", save=True):
+                self.backend.save(data)
+            self.data.clear()
+            self.data.update(data)
+            self._build()
@@ -0,0 +1,192 @@
+"""Streaming export of the thesis data.
+
+``iter_export`` yields the export as chunks of bytes, encoding one record at a
+time, so no JSON document of the whole history is ever built in memory. The
+formats are
+
+* ``json``: a ``thesis_data.json`` file that can be imported again,
+* ``ndjson``: one compact JSON object per line, tagged with its collection,
+* ``reports.csv`` / ``todo.csv``: one collection as CSV,
+* ``reports.parquet``: the reports as Parquet (needs ``pyarrow`` or
+  ``fastparquet``),
+
+optionally gzip-compressed and restricted to a date range (report dates, to-do
+due dates) and to some categories.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from thesis_tracker.codec import encode_fallback
+
+FORMATS = {
+    "json": ("application/json", "thesis_data.json"),
+    "ndjson": ("application/x-ndjson", "thesis_data.ndjson"),
+    "reports.csv": ("text/csv", "reports.csv"),
+    "todo.csv": ("text/csv", "todo.csv"),
+    "reports.parquet": ("application/vnd.apache.parquet", "reports.parquet"),
+}
+REPORT_FIELDS = [
+    "id",
+    "date",
+    "category",
+    "task",
+    "time_spent",
+    "result_rating",
+    "focus_rating",
+    "note",
+]
+TODO_FIELDS = [
+    "id",
+    "name",
+    "category",
+    "priority",
+    "due_date",
+    "estimated_time",
+    "steps",
+    "tags",
+    "completed",
+    "actual_time",
+    "notes",
+]
+NAME_LISTS = ["categories", "tasks", "tags"]
+
+
+def parquet_available():
+    for module in ["pyarrow", "fastparquet"]:
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def _in_range(day, start, end):
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+# Reports and todos passing the date range and category filters
+def select(data, start=None, end=None, categories=()):
+    categories = set(categories)
+
+    def reports():
+        for report in data["reports"]:
+            if categories and report.category not in categories:
+                continue
+            if _in_range(report.date.date(), start, end):
+                yield report
+
+    def todos():
+        for todo in data["todo"]:
+            if categories and todo.category not in categories:
+                continue
+            if _in_range(todo.due_date, start, end):
+                yield todo
+
+    return reports(), todos()
+
+
+def _dumps(value):
+    return json.dumps(value, default=encode_fallback, separators=(",", ":"))
+
+
+def _iter_json(data, reports, todos):
+    yield '{"progress":' + _dumps(data["progress"])
+    for key, records in [("reports", reports), ("todo", todos)]:
+        yield f',\n"{key}":['
+        for i, record in enumerate(records):
+            yield ("," if i else "") + "\n" + _dumps(record)
+        yield "\n]"
+    for key in NAME_LISTS:
+        yield f',\n"{key}":' + _dumps(data[key])
+    yield "\n}\n"
+
+
+def _iter_ndjson(data, reports, todos):
+    for section, value in data["progress"].items():
+        yield _dumps({"collection": "progress", "section": section, "value": value})
+        yield "\n"
+    for key in NAME_LISTS:
+        for name in data[key]:
+            yield _dumps({"collection": key, "name": name}) + "\n"
+    for key, records in [("reports", reports), ("todo", todos)]:
+        for record in records:
+            yield _dumps({"collection": key, **record.to_dict()}) + "\n"
+
+
+def _iter_csv(records, fields):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fields, extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        row = record.to_dict()
+        for field in ["date", "due_date"]:
+            if field in row:
+                row[field] = encode_fallback(row[field])
+        for field in ["steps", "tags"]:
+            if field in row:
+                row[field] = _dumps(row[field])
+        writer.writerow(row)
+        # Hand out what is buffered every few hundred rows
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _parquet(reports):
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(
+        [report.to_dict() for report in reports], columns=REPORT_FIELDS
+    )
+    frame["date"] = pd.to_datetime(frame["date"])
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+# gzip-compress a stream of chunks of bytes
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# The export as chunks of bytes
+def iter_export(data, fmt, start=None, end=None, categories=(), compress=False):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    reports, todos = select(data, start, end, categories)
+    if fmt == "reports.parquet":
+        chunks = iter([_parquet(reports)])
+    else:
+        if fmt == "json":
+            text = _iter_json(data, reports, todos)
+        elif fmt == "ndjson":
+            text = _iter_ndjson(data, reports, todos)
+        elif fmt == "reports.csv":
+            text = _iter_csv(reports, REPORT_FIELDS)
+        else:
+            text = _iter_csv(todos, TODO_FIELDS)
+        chunks = (chunk.encode("utf-8") for chunk in text)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_bytes(data, fmt, start=None, end=None, categories=(), compress=False):
+    return b"".join(iter_export(data, fmt, start, end, categories, compress))
+
+
+# (mime type, file name) of an export
+def export_file(fmt, compress=False):
+    mime, file_name = FORMATS[fmt]
+    if compress:
+        return "application/gzip", file_name + ".gz"
+    return mime, file_name
@@ -0,0 +1,53 @@
+"""Bounded cache of built chart figures.
+
+Building a Plotly figure (validating every trace, laying out the axes) takes
+far longer than drawing it, and most reruns do not change what a chart shows.
+Figures are cached under a key naming the chart and what it was built from:
+the input values when they are small, such as the progress of six sections,
+or the revision of the dataset when hashing the inputs would cost about as
+much as building the figure. A rerun that changed nothing reuses the figure.
+
+At most ``THESIS_MAX_FIGURES`` figures are kept; the least recently used one
+is dropped when another is added.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from thesis_tracker import instrumentation
+
+MAX_FIGURES = int(os.environ.get("THESIS_MAX_FIGURES", "64"))
+
+
+class FigureCache:
+    """LRU cache of figures by key, shared by the sessions of a process."""
+
+    def __init__(self, max_size=MAX_FIGURES):
+        self.max_size = max_size
+        self.figures = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # The figure cached under key, built with build() if there is none; keys
+    # are tuples starting with the name of the chart
+    def get(self, key, build):
+        with self.lock:
+            if key in self.figures:
+                self.figures.move_to_end(key)
+                self.hits += 1
+                return self.figures[key]
+            self.misses += 1
+        # Built outside the lock so that other sessions are not held up; two
+        # sessions missing the same key at once both build it
+        with instrumentation.section(f"figure {key[0]}"):
+            figure = build()
+        with self.lock:
+            self.figures[key] = figure
+            while len(self.figures) > self.max_size:
+                self.figures.popitem(last=False)
+        return figure
+
+    def __len__(self):
+        return len(self.figures)
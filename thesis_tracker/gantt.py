@@ -0,0 +1,93 @@
+"""Bars of the Gantt chart, with a date window and level of detail.
+
+A to-do is drawn from ``estimated_time / 8`` days (one working day per eight
+hours) before its due date up to the due date. ``gantt_bars`` keeps the to-dos
+overlapping a date window and returns one bar per to-do when there are at most
+``max_bars`` of them. Otherwise it zooms out: the to-dos are aggregated into
+one bar per category and week, month, quarter or year (by due date), at the
+finest of these levels that fits in ``max_bars``. The figure stays bounded
+whatever the number of to-dos, and single bars appear once the window is
+narrow enough.
+"""
+
+from datetime import date, timedelta
+
+MAX_BARS = 200
+LEVELS = ["task", "week", "month", "quarter", "year"]
+
+
+# (start, finish) dates of the bar of a to-do
+def task_span(todo):
+    return todo.due_date - timedelta(days=int(todo.estimated_time / 8)), todo.due_date
+
+
+# To-dos whose bar overlaps the window; open ends are unbounded
+def tasks_in_window(todos, start=None, end=None, include_completed=True):
+    for todo in todos:
+        if todo.completed and not include_completed:
+            continue
+        task_start, task_finish = task_span(todo)
+        if start is not None and task_finish < start:
+            continue
+        if end is not None and task_start > end:
+            continue
+        yield todo
+
+
+# (first day, first day of the next) period of a level containing day
+def period(day, level):
+    if level == "week":
+        first = day - timedelta(days=day.weekday())
+        return first, first + timedelta(days=7)
+    if level == "year":
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    months = 3 if level == "quarter" else 1
+    month = (day.month - 1) // months * months
+    first = date(day.year, month + 1, 1)
+    month += months
+    return first, date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _task_bar(todo):
+    start, finish = task_span(todo)
+    return {
+        "Task": todo.name,
+        "Start": start,
+        "Finish": finish,
+        "Category": todo.category,
+        "Tasks": 1,
+        "Hours": todo.estimated_time,
+    }
+
+
+# One bar per category and period, counting the to-dos due in it
+def _aggregate(todos, level):
+    bars = {}
+    for todo in todos:
+        start, finish = period(todo.due_date, level)
+        bar = bars.get((todo.category, start))
+        if bar is None:
+            bar = bars[todo.category, start] = {
+                "Task": todo.category,
+                "Start": start,
+                "Finish": finish,
+                "Category": todo.category,
+                "Tasks": 0,
+                "Hours": 0,
+            }
+        bar["Tasks"] += 1
+        bar["Hours"] += todo.estimated_time
+    return list(bars.values())
+
+
+# (level, bars) of the to-dos in the window at the finest level of detail with
+# at most max_bars bars; the coarsest level is used if none fits
+def gantt_bars(todos, start=None, end=None, include_completed=True, max_bars=MAX_BARS):
+    visible = list(tasks_in_window(todos, start, end, include_completed))
+    if len(visible) <= max_bars:
+        return "task", [_task_bar(todo) for todo in visible]
+    for level in LEVELS[1:]:
+        bars = _aggregate(visible, level)
+        if len(bars) <= max_bars:
+            break
+    return level, bars
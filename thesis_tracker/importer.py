@@ -0,0 +1,403 @@
+"""Streaming, validating import of ``thesis_data.json`` files.
+
+The file is read in chunks and the records of the ``reports`` and ``todo``
+lists are decoded one at a time, so a large upload is never held as one JSON
+document next to its parsed copy. Every record is validated and normalized
+into ``Report``/``TodoTask`` records (dates become ``datetime``/``date``
+objects, numbers are checked for range, missing optional fields get their
+defaults); records that fail are skipped and reported with their position
+instead of aborting the import.
+
+With ``existing`` data the import runs in merge mode: records whose id or
+content is already present (or that appear twice in the file) are counted as
+duplicates and only new records are returned.
+
+``import_rows`` reads the reports or to-dos of a CSV or NDJSON file the same
+way, e.g. to log many records at once from the command line.
+"""
+
+import csv
+import json
+import math
+from datetime import date, datetime
+
+from thesis_tracker.indexes import PRIORITY_ORDER
+from thesis_tracker.records import Record, Report, Step, TodoTask
+from thesis_tracker.records import local_datetime
+from thesis_tracker.storage import empty_data, new_id
+
+# Characters read from the file at a time
+CHUNK_SIZE = 64 * 1024
+LIST_KEYS = ["reports", "categories", "tasks", "todo", "tags"]
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Decodes consecutive JSON values from a text file read in chunks."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        # Characters dropped from the front of the buffer so far
+        self.consumed = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        # Grow the read size with the buffer so a huge value is not re-parsed
+        # once per chunk
+        chunk = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.consumed += self.pos
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    @property
+    def offset(self):
+        return self.consumed + self.pos
+
+    # Next non-whitespace character, "" at the end of the file
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at character {self.offset}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"Invalid JSON at character {self.offset}: {e.msg}")
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+# (key, position, value) for every item of the top-level lists and
+# (key, None, value) for every other top-level value
+def iter_sections(f, chunk_size=CHUNK_SIZE):
+    reader = _Reader(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected a key at character {reader.offset}")
+        reader.expect(":")
+        if reader.peek() == "[":
+            reader.expect("[")
+            position = 0
+            while reader.peek() != "]":
+                if position:
+                    reader.expect(",")
+                yield key, position, reader.value()
+                position += 1
+            reader.expect("]")
+        else:
+            yield key, None, reader.value()
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
+    if reader.peek():
+        raise ValueError(f"Unexpected data at character {reader.offset}")
+
+
+def _text(record, field, default=None):
+    value = record.get(field, default)
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+
+def _number(record, field, default=None, high=None, integer=False):
+    value = record.get(field, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number")
+    if integer and value != int(value):
+        raise ValueError(f"{field} must be a whole number")
+    if not math.isfinite(value) or value < 0 or (high is not None and value > high):
+        raise ValueError(f"{field} is out of range")
+    return int(value) if integer else value
+
+
+def _datetime(record, field):
+    value = record.get(field)
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an ISO date and time")
+    return local_datetime(value)
+
+
+def _date(record, field):
+    value = record.get(field)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an ISO date")
+
+
+def _record_id(record):
+    record_id = record.get("id") or new_id()
+    if not isinstance(record_id, str):
+        raise ValueError("id must be a string")
+    return record_id
+
+
+def normalize_report(record):
+    if not isinstance(record, dict):
+        raise ValueError("report must be an object")
+    return Report.from_dict(
+        {
+            "date": _datetime(record, "date"),
+            "category": _text(record, "category"),
+            "task": _text(record, "task"),
+            "time_spent": _number(record, "time_spent"),
+            "result_rating": _number(record, "result_rating", high=5, integer=True),
+            "focus_rating": _number(record, "focus_rating", high=5, integer=True),
+            "note": _text(record, "note", ""),
+            "id": _record_id(record),
+        }
+    )
+
+
+def _step(step):
+    if not isinstance(step, dict):
+        raise ValueError("steps must be objects")
+    completed = step.get("completed", False)
+    if not isinstance(completed, bool):
+        raise ValueError("step completed must be true or false")
+    return Step(_text(step, "step"), completed)
+
+
+def normalize_todo(record):
+    if not isinstance(record, dict):
+        raise ValueError("todo must be an object")
+    priority = _text(record, "priority")
+    if priority not in PRIORITY_ORDER:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITY_ORDER)}")
+    steps = record.get("steps", [])
+    tags = record.get("tags", [])
+    if not isinstance(steps, list):
+        raise ValueError("steps must be a list")
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError("tags must be a list of strings")
+    completed = record.get("completed", False)
+    if not isinstance(completed, bool):
+        raise ValueError("completed must be true or false")
+    return TodoTask.from_dict(
+        {
+            "name": _text(record, "name"),
+            "category": _text(record, "category"),
+            "priority": priority,
+            "due_date": _date(record, "due_date"),
+            "estimated_time": _number(record, "estimated_time"),
+            "steps": [_step(step) for step in steps],
+            "tags": tags,
+            "completed": completed,
+            "actual_time": _number(record, "actual_time", 0),
+            "notes": _text(record, "notes", ""),
+            "id": _record_id(record),
+        }
+    )
+
+
+def normalize_name(value):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("must be a non-empty string")
+    return value
+
+
+def normalize_progress(value):
+    if not isinstance(value, dict):
+        raise ValueError("progress must be an object")
+    return {
+        section: _number(value, section, high=100, integer=True) for section in value
+    }
+
+
+NORMALIZERS = {
+    "reports": normalize_report,
+    "todo": normalize_todo,
+    "categories": normalize_name,
+    "tasks": normalize_name,
+    "tags": normalize_name,
+}
+
+
+# Key identifying a record with the same content, whatever its id
+def content_key(key, record):
+    if key == "reports":
+        return tuple(
+            record.get(field) for field in ["date", "category", "task", "note"]
+        )
+    if key == "todo":
+        return tuple(record.get(field) for field in ["name", "category", "due_date"])
+    return record
+
+
+class ImportResult:
+    """Validated records of an import plus what was skipped.
+
+    Records whose id or content is in ``existing`` or was added before are
+    counted as duplicates.
+    """
+
+    def __init__(self, existing=None):
+        self.data = empty_data()
+        # [(section, position or None, message)]
+        self.errors = []
+        self.duplicates = 0
+        self._seen_ids = set()
+        self._seen = {key: set() for key in LIST_KEYS}
+        for key in LIST_KEYS:
+            for record in (existing or {}).get(key, []):
+                if isinstance(record, Record):
+                    self._seen_ids.add(record.id)
+                self._seen[key].add(content_key(key, record))
+
+    def counts(self):
+        return {key: len(self.data[key]) for key in LIST_KEYS}
+
+    def _known(self, key, record):
+        return content_key(key, record) in self._seen[key] or (
+            isinstance(record, Record) and record.id in self._seen_ids
+        )
+
+    # Drop the records already in existing, e.g. data loaded after the import
+    # was read, and count them as duplicates
+    def skip_existing(self, existing):
+        known = ImportResult(existing)
+        for key in LIST_KEYS:
+            records = self.data[key]
+            self.data[key] = [r for r in records if not known._known(key, r)]
+            self.duplicates += len(records) - len(self.data[key])
+
+    # Validate and normalize the item at position of the list key and keep it
+    # unless it is a duplicate
+    def add(self, key, position, value):
+        try:
+            record = NORMALIZERS[key](value)
+        except ValueError as e:
+            self.errors.append((key, position, str(e)))
+            return
+        if self._known(key, record):
+            self.duplicates += 1
+            return
+        self._seen[key].add(content_key(key, record))
+        if isinstance(record, Record):
+            self._seen_ids.add(record.id)
+        self.data[key].append(record)
+
+
+# Read, validate and normalize a thesis_data.json file. With existing data,
+# only records not already in it are kept (merge mode).
+def import_data(f, existing=None, chunk_size=CHUNK_SIZE):
+    result = ImportResult(existing)
+    for key, position, value in iter_sections(f, chunk_size):
+        if key == "progress":
+            try:
+                result.data["progress"] = normalize_progress(value)
+            except ValueError as e:
+                result.errors.append((key, None, str(e)))
+            continue
+        if key not in NORMALIZERS:
+            continue
+        if position is None:
+            result.errors.append((key, None, f"{key} must be a list"))
+            continue
+        result.add(key, position, value)
+    return result
+
+
+# Fields of the CSV exports that are not plain text
+CSV_NUMBERS = {
+    "time_spent",
+    "result_rating",
+    "focus_rating",
+    "estimated_time",
+    "actual_time",
+}
+CSV_LISTS = {"steps", "tags"}
+CSV_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+# Record of a CSV row as written by the exporter; empty cells are left out
+def _csv_record(row):
+    record = {}
+    for field, text in row.items():
+        if field is None or not text:
+            continue
+        if field in CSV_NUMBERS:
+            try:
+                record[field] = float(text)
+            except ValueError:
+                raise ValueError(f"{field} must be a number")
+        elif field in CSV_LISTS:
+            try:
+                record[field] = json.loads(text)
+            except ValueError:
+                raise ValueError(f"{field} must be a JSON list")
+        elif field == "completed":
+            if text.strip().lower() not in CSV_BOOLEANS:
+                raise ValueError("completed must be true or false")
+            record[field] = CSV_BOOLEANS[text.strip().lower()]
+        else:
+            record[field] = text
+    return record
+
+
+def _ndjson_record(line):
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("line must be a JSON object")
+    return record
+
+
+# Read, validate and normalize the records of one list ("reports" or "todo")
+# from a CSV file or NDJSON lines, as written by the exporter. NDJSON lines
+# tagged with another collection are skipped.
+def import_rows(f, key, fmt, existing=None):
+    if fmt == "csv":
+        rows, parse = csv.DictReader(f), _csv_record
+    elif fmt == "ndjson":
+        rows, parse = (line for line in f if line.strip()), _ndjson_record
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+    result = ImportResult(existing)
+    for position, row in enumerate(rows):
+        try:
+            value = parse(row)
+        except ValueError as e:
+            result.errors.append((key, position, str(e)))
+            continue
+        if value.pop("collection", key) != key:
+            continue
+        result.add(key, position, value)
+    return result
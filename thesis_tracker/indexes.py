@@ -0,0 +1,313 @@
+"""In-memory indexes over the todo and report lists."""
+
+from bisect import bisect_left, insort
+from datetime import timedelta
+from itertools import count
+
+from thesis_tracker.search import TextIndex
+
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+
+class RecordIndex:
+    """id -> record and id -> list position for one collection.
+
+    ``records`` is the list of records stored in the data (``data["todo"]`` or
+    ``data["reports"]``); the index is kept in sync by ``apply_change``. The
+    full-text index of the ``TEXT_FIELDS`` is built on the first search.
+    """
+
+    # Field -> weight of the fields the full-text search looks at
+    TEXT_FIELDS = {}
+
+    def __init__(self, records):
+        self.reset(records)
+
+    # Index a new list, e.g. after the whole collection was replaced
+    def reset(self, records):
+        self.records = records
+        self.by_id = {record.id: record for record in records if record.id is not None}
+        self._positions = None
+        self._text = None
+
+    def __contains__(self, record_id):
+        return record_id in self.by_id
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, record_id):
+        return self.by_id[record_id]
+
+    def position(self, record_id):
+        # Positions are rebuilt lazily after a removal shifted them
+        if self._positions is None:
+            self._positions = {
+                record.id: i
+                for i, record in enumerate(self.records)
+                if record.id is not None
+            }
+        return self._positions[record_id]
+
+    # Register the record just appended to the list
+    def add(self, record):
+        if record.id is None:
+            return
+        self.by_id[record.id] = record
+        if self._positions is not None:
+            self._positions[record.id] = len(self.records) - 1
+        if self._text is not None:
+            self._text.add(record.id, self.text_fields(record))
+
+    # Forget a record just deleted from the list
+    def discard(self, record_id):
+        self.by_id.pop(record_id, None)
+        self._positions = None
+        if self._text is not None:
+            self._text.remove(record_id)
+
+    # Called before and after a field of an indexed record is assigned
+    def changing(self, record, field):
+        pass
+
+    def changed(self, record, field):
+        if self._text is not None and field in self.TEXT_FIELDS:
+            if record.id in self.by_id:
+                self._text.add(record.id, self.text_fields(record))
+
+    # (text, weight) of the searchable fields of record
+    def text_fields(self, record):
+        return [(getattr(record, field), w) for field, w in self.TEXT_FIELDS.items()]
+
+    @property
+    def text(self):
+        if self._text is None:
+            text = TextIndex()
+            for record in self.by_id.values():
+                text.add(record.id, self.text_fields(record))
+            self._text = text
+        return self._text
+
+    # The best limit (or all) records matching the words of query, best first,
+    # and the number of all matches; only records whose id is in within are
+    # considered when it is given
+    def search(self, query, limit=None, within=None):
+        ids, total = self.text.search(query, limit, within)
+        return [self.by_id[record_id] for record_id in ids], total
+
+
+# Sort key of a todo for each "Sort by" option of the To-Do page
+SORT_KEYS = {
+    "Due Date": lambda todo: str(todo.due_date),
+    "Priority": lambda todo: PRIORITY_ORDER.get(todo.priority, len(PRIORITY_ORDER)),
+    "Estimated Time": lambda todo: -todo.estimated_time,
+}
+# Fields the filter indexes and orderings depend on
+INDEXED_FIELDS = {"category", "priority", "tags", "due_date", "estimated_time"}
+
+
+class TodoIndex(RecordIndex):
+    """Todo index with inverted filter indexes and maintained sort orders.
+
+    ``by_category``, ``by_priority`` and ``by_tag`` map a value to the ids of
+    the todos having it; ``orderings`` keeps, for every "Sort by" option, a
+    sorted list of ``(key, seq, id)`` where ``seq`` preserves insertion order
+    between equal keys.
+    """
+
+    TEXT_FIELDS = {"name": 2, "notes": 1, "steps": 1}
+
+    def reset(self, records):
+        super().reset(records)
+        self._seq = count()
+        self.seq = {}
+        self.by_category = {}
+        self.by_priority = {}
+        self.by_tag = {}
+        self.orderings = {sort_by: [] for sort_by in SORT_KEYS}
+        for record in records:
+            if record.id is not None:
+                self.seq[record.id] = next(self._seq)
+                self._index(record)
+        for ordering in self.orderings.values():
+            ordering.sort()
+
+    def _entries(self, record):
+        return [
+            (self.by_category, [record.category]),
+            (self.by_priority, [record.priority]),
+            (self.by_tag, record.tags),
+        ], record.id
+
+    def _index(self, record, keep_sorted=False):
+        groups, todo_id = self._entries(record)
+        for inverted, values in groups:
+            for value in values:
+                inverted.setdefault(value, set()).add(todo_id)
+        for sort_by, key in SORT_KEYS.items():
+            entry = (key(record), self.seq[todo_id], todo_id)
+            if keep_sorted:
+                insort(self.orderings[sort_by], entry)
+            else:
+                self.orderings[sort_by].append(entry)
+
+    def _unindex(self, record):
+        groups, todo_id = self._entries(record)
+        for inverted, values in groups:
+            for value in values:
+                inverted.get(value, set()).discard(todo_id)
+        for sort_by, key in SORT_KEYS.items():
+            ordering = self.orderings[sort_by]
+            entry = (key(record), self.seq[todo_id], todo_id)
+            i = bisect_left(ordering, entry)
+            if i < len(ordering) and ordering[i] == entry:
+                del ordering[i]
+
+    def add(self, record):
+        if record.id is None:
+            return
+        super().add(record)
+        self.seq[record.id] = next(self._seq)
+        self._index(record, keep_sorted=True)
+
+    def discard(self, record_id):
+        record = self.by_id.get(record_id)
+        if record is not None:
+            self._unindex(record)
+            del self.seq[record_id]
+        super().discard(record_id)
+
+    def changing(self, record, field):
+        if field in INDEXED_FIELDS and record.id in self.by_id:
+            self._unindex(record)
+
+    def changed(self, record, field):
+        super().changed(record, field)
+        if field in INDEXED_FIELDS and record.id in self.by_id:
+            self._index(record, keep_sorted=True)
+
+    # The text of every step is searched, with the weight of "steps"
+    def text_fields(self, record):
+        weights = self.TEXT_FIELDS
+        return [(record.name, weights["name"]), (record.notes, weights["notes"])] + [
+            (step.step, weights["steps"]) for step in record.steps
+        ]
+
+    # Todos matching all given filters (any of the values within one filter),
+    # in the order of sort_by or in stored order; never reorders the list
+    def filter(self, categories=(), priorities=(), tags=(), sort_by=None):
+        candidates = None
+        for inverted, values in [
+            (self.by_category, categories),
+            (self.by_priority, priorities),
+            (self.by_tag, tags),
+        ]:
+            if not values:
+                continue
+            matching = set().union(*(inverted.get(value, ()) for value in values))
+            candidates = matching if candidates is None else candidates & matching
+
+        if sort_by in self.orderings:
+            ordering = self.orderings[sort_by]
+            if candidates is None:
+                ids = [todo_id for _, _, todo_id in ordering]
+            elif len(candidates) * 8 < len(ordering):
+                # Few matches: sorting them is cheaper than walking the ordering
+                key = SORT_KEYS[sort_by]
+                ids = sorted(
+                    candidates,
+                    key=lambda todo_id: (key(self.by_id[todo_id]), self.seq[todo_id]),
+                )
+            else:
+                ids = [todo_id for _, _, todo_id in ordering if todo_id in candidates]
+        elif candidates is None:
+            return list(self.records)
+        else:
+            ids = sorted(candidates, key=self.seq.__getitem__)
+        return [self.by_id[todo_id] for todo_id in ids]
+
+
+# Monday of the week a report falls in
+def week_start(report_date):
+    return (report_date - timedelta(days=report_date.weekday())).date()
+
+
+class ReportIndex(RecordIndex):
+    """Report index that also buckets the reports by week.
+
+    ``weeks`` maps a week start to the sorted ``(date, id)`` entries of its
+    reports and ``week_starts`` keeps the week starts in ascending order.
+    """
+
+    TEXT_FIELDS = {"task": 2, "note": 1}
+
+    def reset(self, records):
+        super().reset(records)
+        self.weeks = {}
+        for record in records:
+            if record.id is not None:
+                week = self.weeks.setdefault(week_start(record.date), [])
+                week.append((record.date, record.id))
+        for entries in self.weeks.values():
+            entries.sort()
+        self.week_starts = sorted(self.weeks)
+
+    def _bucket(self, record):
+        return week_start(record.date), (record.date, record.id)
+
+    def _rebucket(self, record):
+        week, entry = self._bucket(record)
+        if week not in self.weeks:
+            self.weeks[week] = []
+            insort(self.week_starts, week)
+        insort(self.weeks[week], entry)
+
+    def add(self, record):
+        if record.id is None:
+            return
+        super().add(record)
+        self._rebucket(record)
+
+    def _unbucket(self, record):
+        week, entry = self._bucket(record)
+        entries = self.weeks.get(week, [])
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+        if not entries and week in self.weeks:
+            del self.weeks[week]
+            del self.week_starts[bisect_left(self.week_starts, week)]
+
+    def discard(self, record_id):
+        record = self.by_id.get(record_id)
+        if record is not None:
+            self._unbucket(record)
+        super().discard(record_id)
+
+    def changing(self, record, field):
+        if field == "date" and record.id in self.by_id:
+            self._unbucket(record)
+
+    def changed(self, record, field):
+        super().changed(record, field)
+        if field == "date" and record.id in self.by_id:
+            self._rebucket(record)
+
+    # Week starts, newest first
+    def newest_weeks(self):
+        return self.week_starts[::-1]
+
+    def week_size(self, week):
+        return len(self.weeks.get(week, ()))
+
+    # Reports of one week, newest first
+    def week_reports(self, week):
+        return [self.by_id[report_id] for _, report_id in reversed(self.weeks[week])]
+
+
+# Indexes of the collections whose records carry ids
+def build_indexes(data):
+    return {
+        "todo": TodoIndex(data.setdefault("todo", [])),
+        "reports": ReportIndex(data.setdefault("reports", [])),
+    }
@@ -0,0 +1,256 @@
+"""Opt-in timings and counters of the app's script runs.
+
+Set ``THESIS_METRICS=1`` to record, for every run of the script, the time
+spent in each section (the page, the sidebar, figure building, ...), the
+number and time of the storage calls, how many times the data was saved and
+how many bytes were written to the data files, and the memory held by the
+session. The app shows the metrics of the current run in a sidebar panel and
+writes the totals of the process to ``THESIS_METRICS_FILE`` (default
+``thesis_metrics.prom``) after every run, in the Prometheus text format read by
+node_exporter's textfile collector and most other scrapers.
+
+Metrics are collected per thread, as Streamlit runs the script and callbacks
+of a session in one thread; callbacks count towards the run they trigger.
+When instrumentation is off, ``section`` and ``timed`` do nothing.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from types import ModuleType
+
+ENABLED = os.environ.get("THESIS_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("THESIS_METRICS_FILE", "thesis_metrics.prom")
+
+_local = threading.local()
+_null = nullcontext()
+
+
+class RunMetrics:
+    """Timings and counters of one run of the script."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = None
+        # name -> [calls, seconds]
+        self.sections = defaultdict(lambda: [0, 0.0])
+        self.storage = defaultdict(lambda: [0, 0.0])
+        self.saves = 0
+        self.bytes_written = 0
+        self.session_bytes = 0
+
+    def finish(self, session_bytes=0):
+        self.seconds = time.perf_counter() - self.started
+        self.session_bytes = session_bytes
+
+
+class ProcessMetrics:
+    """Totals of the finished runs of all sessions of this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.runs = defaultdict(lambda: [0, 0.0])
+        self.sections = defaultdict(lambda: [0, 0.0])
+        self.storage = defaultdict(lambda: [0, 0.0])
+        self.saves = 0
+        self.bytes_written = 0
+        self.last_session_bytes = 0
+
+    def add(self, page, run):
+        with self.lock:
+            totals = self.runs[page]
+            totals[0] += 1
+            totals[1] += run.seconds
+            for mine, theirs in [
+                (self.sections, run.sections),
+                (self.storage, run.storage),
+            ]:
+                for name, (calls, seconds) in theirs.items():
+                    mine[name][0] += calls
+                    mine[name][1] += seconds
+            self.saves += run.saves
+            self.bytes_written += run.bytes_written
+            self.last_session_bytes = run.session_bytes
+
+
+totals = ProcessMetrics()
+
+
+# Metrics of the run in progress on this thread
+def current_run():
+    run = getattr(_local, "run", None)
+    if run is None:
+        run = _local.run = RunMetrics()
+    return run
+
+
+@contextmanager
+def _timed(table, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = getattr(current_run(), table)[name]
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+
+
+# Context manager timing a section of the script
+def section(name):
+    return _timed("sections", name) if ENABLED else _null
+
+
+# Context manager timing a call to the storage backend; saves are counted
+def timed(call, save=False):
+    if not ENABLED:
+        return _null
+    if save:
+        current_run().saves += 1
+    return _timed("storage", call)
+
+
+def count_written(nbytes):
+    if ENABLED:
+        current_run().bytes_written += nbytes
+
+
+# Approximate memory held by value and everything it contains, in bytes
+def deep_size(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    # Classes, modules and functions are shared, not held by the session
+    if isinstance(value, (type, ModuleType)) or callable(value):
+        return size
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    elif hasattr(value, "__slots__"):
+        size += sum(
+            deep_size(getattr(value, name), seen)
+            for name in value.__slots__
+            if hasattr(value, name)
+        )
+    return size
+
+
+# Resident memory of this process in bytes; the peak where the current value
+# is not available
+def resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# End the run of this thread, add it to the totals and write the metrics file
+def finish_run(page, session_bytes=0, figure_cache=None):
+    run = current_run()
+    _local.run = None
+    run.finish(session_bytes)
+    totals.add(page, run)
+    write_metrics(METRICS_FILE, figure_cache)
+    return run
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Lines of the process totals in the Prometheus text format
+def metrics_lines(figure_cache=None):
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP thesis_{name} {help_text}")
+        lines.append(f"# TYPE thesis_{name} {kind}")
+        for labels, value in samples:
+            if labels:
+                labels = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                lines.append(f"thesis_{name}{{{labels}}} {value}")
+            else:
+                lines.append(f"thesis_{name} {value}")
+
+    with totals.lock:
+        for name, label, table, what in [
+            ("runs", "page", totals.runs, "Script runs"),
+            ("section", "section", totals.sections, "Timed sections"),
+            ("storage", "call", totals.storage, "Storage calls"),
+        ]:
+            metric(
+                f"{name}_total",
+                "counter",
+                f"{what} finished.",
+                [({label: key}, calls) for key, (calls, _) in table.items()],
+            )
+            metric(
+                f"{name}_seconds_total",
+                "counter",
+                f"Time spent in {what.lower()}.",
+                [
+                    ({label: key}, f"{seconds:.6f}")
+                    for key, (_, seconds) in table.items()
+                ],
+            )
+        metric(
+            "saves_total",
+            "counter",
+            "Changes and snapshots saved.",
+            [({}, totals.saves)],
+        )
+        metric(
+            "written_bytes_total",
+            "counter",
+            "Bytes written to the data files.",
+            [({}, totals.bytes_written)],
+        )
+        metric(
+            "session_bytes",
+            "gauge",
+            "Memory held by the session state of the last run.",
+            [({}, totals.last_session_bytes)],
+        )
+    metric(
+        "resident_bytes",
+        "gauge",
+        "Resident memory of the process.",
+        [({}, resident_bytes())],
+    )
+    if figure_cache is not None:
+        metric(
+            "figure_cache_hits_total",
+            "counter",
+            "Figures reused from the cache.",
+            [({}, figure_cache.hits)],
+        )
+        metric(
+            "figure_cache_misses_total",
+            "counter",
+            "Figures built on a cache miss.",
+            [({}, figure_cache.misses)],
+        )
+    return lines
+
+
+# Atomically replace path with the current metrics
+def write_metrics(path, figure_cache=None):
+    text = "\n".join(metrics_lines(figure_cache)) + "\n"
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,81 @@
+"""Incrementally maintained aggregates behind the Statistics page.
+
+``ReportRollups`` keeps per-day and per-category sums and counts of the
+reports. It is built once from the storage backend and then updated with
+``add``/``remove`` whenever a report is logged or deleted, so the Statistics
+page renders from tables whose size depends on the number of days and
+categories, not on the number of reports.
+"""
+
+
+class ReportRollups:
+    """Per-day and per-category aggregates of the reports."""
+
+    def __init__(self):
+        # day -> [time spent, result rating sum, focus rating sum, count]
+        self.days = {}
+        # category -> [time spent, count]
+        self.categories = {}
+
+    @classmethod
+    def from_reports(cls, reports):
+        rollups = cls()
+        for report in reports:
+            rollups.add(report)
+        return rollups
+
+    # Build from (day, time, result sum, focus sum, count) and
+    # (category, time, count) rows as returned by the storage backend
+    @classmethod
+    def from_rows(cls, day_rows, category_rows):
+        rollups = cls()
+        for day, time_spent, result_sum, focus_sum, count in day_rows:
+            rollups.days[day] = [time_spent, result_sum, focus_sum, count]
+        for category, time_spent, count in category_rows:
+            rollups.categories[category] = [time_spent, count]
+        return rollups
+
+    def _apply(self, report, sign):
+        day = report.date.date()
+        row = self.days.setdefault(day, [0, 0, 0, 0])
+        row[0] += sign * report.time_spent
+        row[1] += sign * report.result_rating
+        row[2] += sign * report.focus_rating
+        row[3] += sign
+        if row[3] <= 0:
+            del self.days[day]
+
+        row = self.categories.setdefault(report.category, [0, 0])
+        row[0] += sign * report.time_spent
+        row[1] += sign
+        if row[1] <= 0:
+            del self.categories[report.category]
+
+    def add(self, report):
+        self._apply(report, 1)
+
+    def remove(self, report):
+        self._apply(report, -1)
+
+    # [(day, time spent, avg result, avg focus, avg productivity)] by day
+    def daily_stats(self):
+        return [
+            (day, t, res / n, foc / n, (res + foc) / 2 / n)
+            for day, (t, res, foc, n) in sorted(self.days.items())
+        ]
+
+    # [(category, time spent)]
+    def category_stats(self):
+        return sorted((category, t) for category, (t, n) in self.categories.items())
+
+    # (total time spent, avg result rating, avg focus rating, number of reports)
+    def totals(self):
+        count = sum(row[3] for row in self.days.values())
+        if not count:
+            return 0, 0, 0, 0
+        return (
+            sum(row[0] for row in self.days.values()),
+            sum(row[1] for row in self.days.values()) / count,
+            sum(row[2] for row in self.days.values()) / count,
+            count,
+        )
@@ -0,0 +1,150 @@
+"""Inverted full-text index with prefix matching and ranking.
+
+Documents are lists of ``(text, weight)`` fields, e.g. a report's task and
+note. Text is split into lowercase word tokens; every token maps to the
+documents containing it and the summed weights of the fields it occurs in. A
+query matches the documents containing, for every query word, a token starting
+with it, so "meth insig" finds "Good insights on methodology". Matches are
+ranked by the weight of the matching tokens times their inverse document
+frequency; a token only starting with a query word counts half. Words shorter
+than ``MIN_PREFIX`` only match whole tokens, as one letter starts too many.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from operator import itemgetter
+
+TOKEN = re.compile(r"\w+")
+
+# Score factor of a token a query word is only a prefix of
+PREFIX_WEIGHT = 0.5
+MIN_PREFIX = 2
+
+
+def tokenize(text):
+    return TOKEN.findall(text.casefold()) if text else []
+
+
+class TextIndex:
+    """Token -> {document id: weight} postings, updated one document at a time."""
+
+    def __init__(self):
+        self.postings = {}
+        # document id -> its tokens
+        self.docs = {}
+        # Sorted tokens for prefix lookups, built on the first search
+        self._vocabulary = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    @property
+    def vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    # Index a document, replacing an earlier version of it
+    def add(self, doc_id, fields):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        weights = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0) + weight
+        all_postings = self.postings
+        for token, weight in weights.items():
+            postings = all_postings.get(token)
+            if postings is None:
+                postings = all_postings[token] = {}
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, token)
+            postings[doc_id] = weight
+        self.docs[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        for token in self.docs.pop(doc_id, ()):
+            postings = self.postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[token]
+                if self._vocabulary is not None:
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    # Tokens starting with word, as (token, postings, weight); rarer tokens
+    # weigh more and tokens only starting with word less
+    def _matching(self, word):
+        n = len(self.docs)
+        if len(word) < MIN_PREFIX:
+            postings = self.postings.get(word)
+            return (
+                [(word, postings, math.log(1 + n / len(postings)))] if postings else []
+            )
+        vocabulary = self.vocabulary
+        tokens = []
+        i = bisect_left(vocabulary, word)
+        while i < len(vocabulary) and vocabulary[i].startswith(word):
+            token = vocabulary[i]
+            postings = self.postings[token]
+            weight = math.log(1 + n / len(postings))
+            tokens.append(
+                (token, postings, weight if token == word else weight * PREFIX_WEIGHT)
+            )
+            i += 1
+        return tokens
+
+    # Score of every document matching all words of query; only documents in
+    # within are considered when it is given. Postings are walked newest
+    # first, so that ranking keeps newer documents first among equal scores.
+    def scores(self, query, within=None):
+        words = [self._matching(word) for word in set(tokenize(query))]
+        # The words matching the fewest documents first; later words only
+        # look at the documents matching the earlier ones
+        words.sort(key=lambda tokens: sum(len(postings) for _, postings, _ in tokens))
+        scores = None
+        candidates = within
+        for tokens in words:
+            matches = {}
+            for _, postings, weight in tokens:
+                if candidates is None:
+                    found = reversed(postings.items())
+                elif len(candidates) < len(postings):
+                    found = [
+                        (doc_id, postings[doc_id])
+                        for doc_id in candidates
+                        if doc_id in postings
+                    ]
+                else:
+                    found = [
+                        (doc_id, field_weight)
+                        for doc_id, field_weight in reversed(postings.items())
+                        if doc_id in candidates
+                    ]
+                if not matches:
+                    matches = {doc_id: w * weight for doc_id, w in found}
+                    continue
+                # A word counts once, with its best matching token
+                for doc_id, field_weight in found:
+                    score = field_weight * weight
+                    if score > matches.get(doc_id, 0):
+                        matches[doc_id] = score
+            if scores is not None:
+                matches = {
+                    doc_id: scores[doc_id] + score for doc_id, score in matches.items()
+                }
+            scores = candidates = matches
+            if not scores:
+                break
+        return scores or {}
+
+    # Ids of the best limit (or all) matches of query, best first, and the
+    # number of all matches
+    def search(self, query, limit=None, within=None):
+        scores = self.scores(query, within)
+        if limit is None:
+            ranked = sorted(scores.items(), key=itemgetter(1), reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [doc_id for doc_id, _ in ranked], len(scores)
@@ -0,0 +1,458 @@
+"""SQLite storage backend.
+
+Keeps the thesis data in a local SQLite file with one table per collection and
+indexes for the queries the pages run: reports by date and category, todos by
+due date, priority, category and tag. Todos and reports are addressed by
+their id; list order is the rowid order.
+
+On first use an existing ``thesis_data.json`` is migrated into the database;
+JSON stays available as import/export format through ``import_json`` and
+``export_json``.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+
+from thesis_tracker import codec
+from thesis_tracker.codec import encode_fallback
+from thesis_tracker.indexes import PRIORITY_ORDER
+from thesis_tracker.records import type_records
+from thesis_tracker.rollups import ReportRollups
+from thesis_tracker.storage import (
+    DATA_FILE,
+    JournalStorage,
+    StaleDataError,
+    Storage,
+    apply_user_change,
+    assign_ids,
+    empty_data,
+    rebase_changes,
+    record_position,
+    replace_data,
+)
+
+# Database file
+DB_FILE = os.environ.get("THESIS_DB", "thesis_data.sqlite3")
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS progress (section TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS categories (name TEXT);
+CREATE TABLE IF NOT EXISTS tasks (name TEXT);
+CREATE TABLE IF NOT EXISTS tags (name TEXT);
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT,
+    date TEXT,
+    category TEXT,
+    task TEXT,
+    time_spent REAL,
+    result_rating INTEGER,
+    focus_rating INTEGER,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS todo (
+    id TEXT,
+    name TEXT,
+    category TEXT,
+    priority TEXT,
+    due_date TEXT,
+    estimated_time REAL,
+    steps TEXT,
+    tags TEXT,
+    completed INTEGER,
+    actual_time REAL,
+    notes TEXT
+);
+CREATE TABLE IF NOT EXISTS todo_tags (todo_id TEXT, tag TEXT);
+"""
+INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS reports_id ON reports (id);
+CREATE UNIQUE INDEX IF NOT EXISTS todo_id ON todo (id);
+CREATE INDEX IF NOT EXISTS reports_date ON reports (date);
+CREATE INDEX IF NOT EXISTS reports_category ON reports (category);
+CREATE INDEX IF NOT EXISTS todo_due_date ON todo (due_date);
+CREATE INDEX IF NOT EXISTS todo_priority ON todo (priority);
+CREATE INDEX IF NOT EXISTS todo_category ON todo (category);
+CREATE INDEX IF NOT EXISTS todo_tags_tag ON todo_tags (tag, todo_id);
+CREATE INDEX IF NOT EXISTS todo_tags_todo ON todo_tags (todo_id);
+"""
+
+REPORT_COLUMNS = [
+    "id",
+    "date",
+    "category",
+    "task",
+    "time_spent",
+    "result_rating",
+    "focus_rating",
+    "note",
+]
+TODO_COLUMNS = [
+    "id",
+    "name",
+    "category",
+    "priority",
+    "due_date",
+    "estimated_time",
+    "steps",
+    "tags",
+    "completed",
+    "actual_time",
+    "notes",
+]
+LIST_TABLES = ["categories", "tasks", "tags"]
+
+
+def _iso(value):
+    return encode_fallback(value) if isinstance(value, (datetime, date)) else value
+
+
+def _report_row(report):
+    return [_iso(report.get(column)) for column in REPORT_COLUMNS]
+
+
+def _todo_row(todo):
+    row = [todo.get(column) for column in TODO_COLUMNS]
+    row[TODO_COLUMNS.index("due_date")] = _iso(todo.get("due_date"))
+    row[TODO_COLUMNS.index("steps")] = json.dumps(
+        todo.get("steps", []), default=encode_fallback
+    )
+    row[TODO_COLUMNS.index("tags")] = json.dumps(todo.get("tags", []))
+    return row
+
+
+def _todo_from_row(row):
+    todo = dict(zip(TODO_COLUMNS, row))
+    todo["steps"] = json.loads(todo["steps"] or "[]")
+    todo["tags"] = json.loads(todo["tags"] or "[]")
+    todo["completed"] = bool(todo["completed"])
+    return todo
+
+
+class SqliteStorage(Storage):
+    """Keeps the data in a SQLite database and answers queries with SQL."""
+
+    def __init__(self, path=DB_FILE, json_path=DATA_FILE):
+        self.path = path
+        self.json_path = json_path
+        # State of the database file after this process last read or wrote it
+        self._stamp = None
+        # Whether the tables and indexes were created on this backend
+        self._schema_ready = False
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        if not self._schema_ready:
+            self._create_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _create_schema(self, conn):
+        conn.executescript(TABLES)
+        # Databases created before records had ids
+        for table in ["reports", "todo"]:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if "id" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN id TEXT")
+        conn.executescript(INDEXES)
+
+    def load(self):
+        if not os.path.exists(self.path) and os.path.exists(self.json_path):
+            self.import_json(self.json_path)
+        data = empty_data()
+        with closing(self.connect()) as conn:
+            data["progress"] = dict(conn.execute("SELECT section, value FROM progress"))
+            for table in LIST_TABLES:
+                data[table] = [
+                    name for (name,) in conn.execute(f"SELECT name FROM {table}")
+                ]
+            data["reports"] = [
+                dict(zip(REPORT_COLUMNS, row))
+                for row in conn.execute(
+                    f"SELECT {', '.join(REPORT_COLUMNS)} FROM reports ORDER BY rowid"
+                )
+            ]
+            data["todo"] = [
+                _todo_from_row(row)
+                for row in conn.execute(
+                    f"SELECT {', '.join(TODO_COLUMNS)} FROM todo ORDER BY rowid"
+                )
+            ]
+        self._stamp = self._file_stamp()
+        return type_records(data)
+
+    def changed(self, data):
+        return self._stamp != self._file_stamp()
+
+    def refresh(self, data, indexes=None):
+        if not self.changed(data):
+            return False
+        replace_data(data, self.load(), indexes)
+        return True
+
+    def save(self, data):
+        # Rows are keyed by record id
+        assign_ids(data)
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM progress")
+            self._write_progress(conn, data)
+            for table in LIST_TABLES + ["reports", "todo"]:
+                self._write_collection(conn, data, table)
+        self._stamp = self._file_stamp()
+
+    # Migrate a thesis_data.json export into the database
+    def import_json(self, json_path):
+        self.save(JournalStorage(json_path).load())
+
+    # Write the database out as a thesis_data.json file
+    def export_json(self, json_path):
+        data = self.load()
+        with open(json_path, "wb") as f:
+            codec.dump(data, f)
+
+    def _write_progress(self, conn, data):
+        conn.executemany(
+            "INSERT OR REPLACE INTO progress (section, value) VALUES (?, ?)",
+            data["progress"].items(),
+        )
+
+    def _write_collection(self, conn, data, table):
+        conn.execute(f"DELETE FROM {table}")
+        if table == "todo":
+            conn.execute("DELETE FROM todo_tags")
+            for todo in data["todo"]:
+                self._insert_todo(conn, todo)
+        elif table == "reports":
+            conn.executemany(
+                f"INSERT INTO reports ({', '.join(REPORT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(REPORT_COLUMNS))})",
+                [_report_row(report) for report in data["reports"]],
+            )
+        else:
+            conn.executemany(
+                f"INSERT INTO {table} (name) VALUES (?)",
+                [(name,) for name in data[table]],
+            )
+
+    def _insert_todo(self, conn, todo):
+        conn.execute(
+            f"INSERT INTO todo ({', '.join(TODO_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(TODO_COLUMNS))})",
+            _todo_row(todo),
+        )
+        self._write_todo_tags(conn, todo)
+
+    def _write_todo_tags(self, conn, todo):
+        conn.execute("DELETE FROM todo_tags WHERE todo_id = ?", (todo["id"],))
+        conn.executemany(
+            "INSERT INTO todo_tags (todo_id, tag) VALUES (?, ?)",
+            [(todo["id"], tag) for tag in todo.get("tags", [])],
+        )
+
+    # rowid of a record given by id, or of the row at a list position
+    def _rowid(self, conn, table, key):
+        if isinstance(key, str):
+            query, params = f"SELECT rowid FROM {table} WHERE id = ?", (key,)
+        else:
+            query = f"SELECT rowid FROM {table} ORDER BY rowid LIMIT 1 OFFSET ?"
+            params = (key,)
+        row = conn.execute(query, params).fetchone()
+        if row is None:
+            raise StaleDataError(f"No {table} record {key!r}")
+        return row[0]
+
+    # Apply a change and write just the affected rows, after catching up with
+    # the changes saved by other sessions; SQLite transactions keep concurrent
+    # sessions consistent at the row level
+    def record(self, data, change, indexes=None):
+        refreshed = self.refresh(data, indexes)
+        apply_user_change(data, change, indexes)
+        try:
+            self._write_change(data, change, indexes)
+        except StaleDataError:
+            # The row was deleted since the refresh; drop the change again
+            replace_data(data, self.load(), indexes)
+            raise
+        self._stamp = self._file_stamp()
+        return refreshed
+
+    def _write_change(self, data, change, indexes=None):
+        op, path = change["op"], change["path"]
+        table = path[0]
+        with closing(self.connect()) as conn, conn:
+            if table == "progress":
+                if len(path) == 1:
+                    conn.execute("DELETE FROM progress")
+                    self._write_progress(conn, data)
+                elif op == "remove":
+                    conn.execute("DELETE FROM progress WHERE section = ?", (path[1],))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO progress (section, value) "
+                        "VALUES (?, ?)",
+                        (path[1], data["progress"][path[1]]),
+                    )
+            elif len(path) == 1 and op == "set":
+                self._write_collection(conn, data, table)
+            elif op == "append":
+                self._insert_record(conn, table, data[table][-1])
+            elif op == "discard":
+                conn.execute(
+                    f"DELETE FROM {table} WHERE rowid = "
+                    f"(SELECT MIN(rowid) FROM {table} WHERE name = ?)",
+                    (change["value"],),
+                )
+            elif op == "remove" and len(path) == 2:
+                self._delete_row(conn, table, self._rowid(conn, table, path[1]))
+            else:
+                # Anything inside a record rewrites that record's row
+                rowid = self._rowid(conn, table, path[1])
+                position = path[1]
+                if isinstance(position, str):
+                    position = record_position(
+                        data[table], position, (indexes or {}).get(table)
+                    )
+                self._update_row(conn, table, rowid, data[table][position])
+
+    # Write the final state of the rows the changes touched, in one
+    # transaction; reports and todos addressed by id are inserted, updated or
+    # deleted one by one, anything else is rewritten as a whole
+    def persist(self, data, changes, indexes=None):
+        refreshed, rejected = self.changed(data), []
+        if refreshed:
+            changes, rejected = rebase_changes(data, self.load(), changes, indexes)
+        rewrite, touched = set(), {"reports": {}, "todo": {}}
+        for change in changes:
+            path = change["path"]
+            if path[0] in touched and len(path) > 1 and isinstance(path[1], str):
+                touched[path[0]][path[1]] = None
+            elif path[0] in touched and len(path) == 1 and change["op"] == "append":
+                touched[path[0]][change["value"]["id"]] = None
+            else:
+                rewrite.add(path[0])
+        with closing(self.connect()) as conn, conn:
+            for table in rewrite:
+                if table == "progress":
+                    conn.execute("DELETE FROM progress")
+                    self._write_progress(conn, data)
+                else:
+                    self._write_collection(conn, data, table)
+            for table, ids in touched.items():
+                if table in rewrite or not ids:
+                    continue
+                index = (indexes or {}).get(table)
+                by_id = index.by_id if index else {r.id: r for r in data[table]}
+                # New records are inserted in the order they were appended
+                for record_id in ids:
+                    record = by_id.get(record_id)
+                    row = conn.execute(
+                        f"SELECT rowid FROM {table} WHERE id = ?", (record_id,)
+                    ).fetchone()
+                    if record is None:
+                        if row is not None:
+                            self._delete_row(conn, table, row[0])
+                    elif row is None:
+                        self._insert_record(conn, table, record)
+                    else:
+                        self._update_row(conn, table, row[0], record)
+        self._stamp = self._file_stamp()
+        return refreshed, rejected
+
+    def _insert_record(self, conn, table, record):
+        if table == "todo":
+            self._insert_todo(conn, record)
+        elif table == "reports":
+            conn.execute(
+                f"INSERT INTO reports ({', '.join(REPORT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(REPORT_COLUMNS))})",
+                _report_row(record),
+            )
+        else:
+            conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (record,))
+
+    def _update_row(self, conn, table, rowid, record):
+        if table == "todo":
+            columns, row = TODO_COLUMNS, _todo_row(record)
+            self._write_todo_tags(conn, record)
+        elif table == "reports":
+            columns, row = REPORT_COLUMNS, _report_row(record)
+        else:
+            columns, row = ["name"], [record]
+        conn.execute(
+            f"UPDATE {table} SET {', '.join(c + ' = ?' for c in columns)} "
+            "WHERE rowid = ?",
+            row + [rowid],
+        )
+
+    def _delete_row(self, conn, table, rowid):
+        if table == "todo":
+            conn.execute(
+                "DELETE FROM todo_tags WHERE todo_id = "
+                "(SELECT id FROM todo WHERE rowid = ?)",
+                (rowid,),
+            )
+        conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+
+    def filter_todos(self, index, categories=(), priorities=(), tags=(), sort_by=None):
+        where, params = [], []
+        if categories:
+            where.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if priorities:
+            where.append(f"priority IN ({', '.join('?' * len(priorities))})")
+            params.extend(priorities)
+        if tags:
+            where.append(
+                "id IN (SELECT todo_id FROM todo_tags "
+                f"WHERE tag IN ({', '.join('?' * len(tags))}))"
+            )
+            params.extend(tags)
+        order = "rowid"
+        if sort_by == "Due Date":
+            order = "due_date, rowid"
+        elif sort_by == "Priority":
+            order = (
+                "CASE priority "
+                + " ".join(
+                    f"WHEN '{p}' THEN {rank}" for p, rank in PRIORITY_ORDER.items()
+                )
+                + " END, rowid"
+            )
+        elif sort_by == "Estimated Time":
+            order = "estimated_time DESC, rowid"
+        query = (
+            "SELECT id FROM todo"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {order}"
+        )
+        with closing(self.connect()) as conn:
+            todo_ids = [todo_id for (todo_id,) in conn.execute(query, params)]
+        # Rows other processes inserted since the last refresh are not in the
+        # index yet; they show up after the next one
+        return [index.by_id[i] for i in todo_ids if i in index.by_id]
+
+    def build_rollups(self, data):
+        with closing(self.connect()) as conn:
+            day_rows = [
+                (date.fromisoformat(day), *values)
+                for day, *values in conn.execute(
+                    "SELECT date(date) AS day, SUM(time_spent), SUM(result_rating), "
+                    "SUM(focus_rating), COUNT(*) FROM reports GROUP BY day"
+                )
+            ]
+            category_rows = list(
+                conn.execute(
+                    "SELECT category, SUM(time_spent), COUNT(*) FROM reports "
+                    "GROUP BY category"
+                )
+            )
+        return ReportRollups.from_rows(day_rows, category_rows)
@@ -0,0 +1,525 @@
+"""Storage of the thesis data.
+
+The app talks to a storage backend chosen with the ``THESIS_STORAGE``
+environment variable:
+
+* ``journal`` (default): a JSON snapshot plus an append-only journal. Every
+  change made in the app is appended to the journal as a small change record,
+  so the cost of a click is proportional to the change instead of the whole
+  history. Loading replays the journal on top of the snapshot and the journal
+  is folded back into the snapshot once it grows too large.
+* ``json``: rewrites the whole JSON file on every change.
+* ``sqlite``: a local SQLite database with indexed tables, see
+  ``thesis_tracker.sqlite_storage``.
+
+The JSON files are encoded and decoded with ``thesis_tracker.codec``. The JSON
+backends write the snapshot atomically (temporary file, fsync, rename) and
+hold a lock file while reading or writing, so several sessions, tabs or worker
+processes can share one data file. The data carries a
+``version`` that every saved change increments; a session whose data is older
+than the file first catches up with the changes saved by the others, and a
+change that no longer applies (e.g. to a todo deleted elsewhere) is rejected
+with ``StaleDataError``.
+
+Besides loading and saving, backends answer the queries the pages need (to-do
+filtering, the statistics rollups). The JSON backends answer them from the
+in-memory indexes of ``thesis_tracker.indexes``; the SQLite backend pushes
+them down as indexed queries.
+"""
+
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from thesis_tracker import codec, instrumentation
+from thesis_tracker.indexes import build_indexes
+from thesis_tracker.records import type_value
+from thesis_tracker.rollups import ReportRollups
+
+# File to store the data
+DATA_FILE = "thesis_data.json"
+# Compact the journal into the snapshot once it grows past this size
+JOURNAL_MAX_BYTES = 256 * 1024
+# "journal", "json" or "sqlite"
+STORAGE_MODE = os.environ.get("THESIS_STORAGE", "journal")
+
+
+class StaleDataError(Exception):
+    """A change does not apply to the data as saved by another session."""
+
+
+def empty_data():
+    return {
+        "progress": {},
+        "reports": [],
+        "categories": [],
+        "tasks": [],
+        "todo": [],
+        "tags": [],
+    }
+
+
+# Persistent unique id of a todo or report
+def new_id():
+    return uuid.uuid4().hex
+
+
+# Give every todo and report an id; returns whether any were missing
+def assign_ids(data):
+    missing = False
+    for key in ["todo", "reports"]:
+        for record in data.get(key, []):
+            if not record.get("id"):
+                record["id"] = new_id()
+                missing = True
+    return missing
+
+
+# Hold an exclusive lock on path + ".lock", across threads and processes
+@contextmanager
+def file_lock(path):
+    with open(path + ".lock", "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Replace path with what write(f) writes, so that a crash leaves either the
+# old or the new file but never a truncated one
+def write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        prefix=os.path.basename(path) + ".",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            instrumentation.count_written(f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Replace the contents of data with fresh, re-pointing the indexes at it
+def replace_data(data, fresh, indexes=None):
+    data.clear()
+    data.update(fresh)
+    for name, index in (indexes or {}).items():
+        index.reset(data.setdefault(name, []))
+
+
+# List position of a record, looked up by id
+def record_position(records, record_id, index=None):
+    if index is not None:
+        return index.position(record_id)
+    for i, record in enumerate(records):
+        if record.get("id") == record_id:
+            return i
+    raise KeyError(record_id)
+
+
+# Apply a single change record to the data
+#   {"op": "set", "path": [...], "value": ...}     assign a dict key or list item
+#   {"op": "append", "path": [...], "value": ...}  append to the list at path
+#   {"op": "remove", "path": [...]}                delete a dict key or list item
+#   {"op": "discard", "path": [...], "value": ...} delete value from the list
+# Todos and reports are addressed by id, e.g. ["todo", "<id>", "notes"]; name
+# lists (categories, tasks, tags) are changed by value, since the positions
+# may have moved when the change is applied on top of other sessions' changes.
+# indexes maps collection names to the RecordIndex kept in sync with the data.
+# Dicts of records in the value are turned into records first.
+def apply_change(data, change, indexes=None):
+    op, path = change["op"], list(change["path"])
+    value = type_value(op, path, change.get("value"))
+    index = (indexes or {}).get(path[0])
+    if len(path) > 1 and isinstance(path[1], str) and isinstance(data[path[0]], list):
+        path[1] = record_position(data[path[0]], path[1], index)
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    last = path[-1]
+    # Assignment inside an indexed record
+    record = data[path[0]][path[1]] if index is not None and len(path) > 2 else None
+    if record is not None:
+        index.changing(record, path[2])
+    if op == "set":
+        target[last] = value
+        if index is not None and len(path) == 1:
+            index.reset(value)
+    elif op == "append":
+        target[last].append(value)
+        if index is not None and len(path) == 1:
+            index.add(value)
+    elif op == "remove":
+        removed = target[last]
+        del target[last]
+        if index is not None and len(path) == 2:
+            index.discard(removed.get("id"))
+    elif op == "discard":
+        if value not in target[last]:
+            raise KeyError(value)
+        target[last].remove(value)
+    else:
+        raise ValueError(f"Unknown change operation: {op}")
+    if record is not None:
+        index.changed(record, path[2])
+
+
+# apply_change for a change made by a user, who may have been looking at a
+# record that another session has deleted meanwhile
+def apply_user_change(data, change, indexes=None):
+    try:
+        apply_change(data, change, indexes)
+    except (KeyError, IndexError) as e:
+        raise StaleDataError(f"Change no longer applies: {change}") from e
+
+
+# Replace data with fresh and apply changes, already applied to data, again on
+# top of it; returns the changes that still applied and those that did not
+def rebase_changes(data, fresh, changes, indexes=None):
+    kept, rejected = [], []
+    for change in changes:
+        try:
+            apply_change(fresh, change)
+        except (KeyError, IndexError, TypeError):
+            rejected.append(change)
+        else:
+            kept.append(change)
+    replace_data(data, fresh, indexes)
+    return kept, rejected
+
+
+class Storage:
+    """Base class of the backends; answers queries from in-memory indexes."""
+
+    # Todos matching all given filters, in the requested order; index is the
+    # TodoIndex of the todos
+    def filter_todos(self, index, categories=(), priorities=(), tags=(), sort_by=None):
+        return index.filter(categories, priorities, tags, sort_by)
+
+    # Apply a change to data and persist it; returns whether data was first
+    # refreshed with changes saved by other sessions
+    def record(self, data, change, indexes=None):
+        raise NotImplementedError
+
+    # Persist changes already applied to data, in one write; returns whether
+    # data was first refreshed with changes saved by other sessions, and the
+    # changes that no longer applied after that
+    def persist(self, data, changes, indexes=None):
+        raise NotImplementedError
+
+    # Whether other sessions saved changes that data does not have yet
+    def changed(self, data):
+        return False
+
+    # Catch up with changes saved by other sessions; returns whether there
+    # were any
+    def refresh(self, data, indexes=None):
+        return False
+
+    # Rollups of the reports
+    def build_rollups(self, data):
+        return ReportRollups.from_reports(data["reports"])
+
+
+class JsonStorage(Storage):
+    """Keeps the data in one JSON file that is rewritten on every change."""
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        # version -> state of the files when they held that version
+        self._marks = {}
+
+    # Identity of the snapshot file; changes whenever it is replaced
+    def _snapshot_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _file_state(self):
+        return self._snapshot_stat(), 0
+
+    # Remember the state of the files at the version of data; older versions
+    # are no longer looked up
+    def _mark(self, data):
+        version = data.get("version", 0)
+        self._marks = {v: state for v, state in self._marks.items() if v > version}
+        self._marks[version] = self._file_state()
+
+    def _next_version(self, data):
+        return max([data.get("version", 0), *self._marks]) + 1
+
+    def read_snapshot(self):
+        if not os.path.exists(self.path):
+            return empty_data()
+        try:
+            with open(self.path, "rb") as f:
+                return codec.loads(f.read())
+        except ValueError:
+            return empty_data()
+
+    def load(self):
+        with file_lock(self.path):
+            return self._load()
+
+    def _load(self):
+        data = self.read_snapshot()
+        data.setdefault("version", 0)
+        self._mark(data)
+        return data
+
+    # Write data as the whole saved state. Data without a version, e.g. an
+    # imported file, replaces whatever was saved; data loaded from the files
+    # is refused with StaleDataError if other sessions saved since.
+    def save(self, data):
+        with file_lock(self.path):
+            if "version" in data and self.changed(data):
+                raise StaleDataError("The data was saved by another session")
+            data["version"] = self._next_version(data)
+            self._write(data)
+
+    def _write_snapshot(self, data):
+        write_atomic(self.path, lambda f: codec.dump(data, f))
+
+    def _write(self, data):
+        self._write_snapshot(data)
+        self._mark(data)
+
+    def changed(self, data):
+        return self._marks.get(data.get("version", 0)) != self._file_state()
+
+    # Bring data up to the saved version if another session saved since it was
+    # loaded; returns whether data changed
+    def _sync(self, data, indexes=None):
+        if not self.changed(data):
+            return False
+        replace_data(data, self._load(), indexes)
+        return True
+
+    def refresh(self, data, indexes=None):
+        # Only stat the files unless they changed
+        if not self.changed(data):
+            return False
+        with file_lock(self.path):
+            return self._sync(data, indexes)
+
+    # Changes made since data was last saved, on top of what other sessions
+    # saved meanwhile
+    def _rebase(self, data, changes, indexes=None):
+        if not self.changed(data):
+            return False, changes, []
+        return True, *rebase_changes(data, self._load(), changes, indexes)
+
+    def persist(self, data, changes, indexes=None):
+        with file_lock(self.path):
+            refreshed, _, rejected = self._rebase(data, changes, indexes)
+            data["version"] = self._next_version(data)
+            self._write(data)
+        return refreshed, rejected
+
+    def record(self, data, change, indexes=None):
+        with file_lock(self.path):
+            refreshed = self._sync(data, indexes)
+            apply_user_change(data, change, indexes)
+            data["version"] = self._next_version(data)
+            self._write(data)
+        return refreshed
+
+
+class JournalStorage(JsonStorage):
+    """JSON snapshot plus an append-only journal of change records.
+
+    Journal entries carry the version they produce, so entries already folded
+    into the snapshot are skipped and a session can catch up by replaying only
+    the entries appended since it last read the journal.
+    """
+
+    def __init__(self, path=DATA_FILE):
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+
+    def _file_state(self):
+        return self._snapshot_stat(), self.journal_size()
+
+    # Change records of the journal, starting at byte offset
+    def read_journal(self, offset=0):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    yield codec.loads_change(line)
+                except ValueError:
+                    # A crash in the middle of an append leaves a partial line
+                    continue
+
+    def journal_size(self):
+        if not os.path.exists(self.journal_path):
+            return 0
+        return os.path.getsize(self.journal_path)
+
+    # Apply the journal entries newer than the version of data
+    def _replay(self, data, changes, indexes):
+        for change in changes:
+            version = change.get("version", data.get("version", 0) + 1)
+            if version <= data.get("version", 0):
+                continue
+            try:
+                apply_change(data, change, indexes)
+            except (KeyError, IndexError, TypeError):
+                pass
+            data["version"] = version
+
+    def _load(self):
+        data = self.read_snapshot()
+        data.setdefault("version", 0)
+        self._replay(data, self.read_journal(), build_indexes(data))
+        self._fold_or_mark(data)
+        return data
+
+    # Writes a full snapshot and empties the journal
+    def _write(self, data):
+        self._write_snapshot(data)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._mark(data)
+
+    def _sync(self, data, indexes=None):
+        mark = self._marks.get(data.get("version", 0))
+        snapshot, journal_size = self._file_state()
+        if mark == (snapshot, journal_size):
+            return False
+        if mark is not None and mark[0] == snapshot and mark[1] < journal_size:
+            # Other sessions only appended to the journal: replay their entries
+            self._replay(data, self.read_journal(mark[1]), indexes)
+            self._mark(data)
+        else:
+            replace_data(data, self._load(), indexes)
+        return True
+
+    def _append(self, entries):
+        with open(self.journal_path, "ab") as f:
+            # Keep a partial line left by a crash apart from the new entries
+            if f.tell() and not self._ends_with_newline():
+                f.write(b"\n")
+            lines = b"".join(
+                codec.dumps(entry, compact=True) + b"\n" for entry in entries
+            )
+            f.write(lines)
+            instrumentation.count_written(len(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _ends_with_newline(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def record(self, data, change, indexes=None):
+        with file_lock(self.path):
+            refreshed = self._sync(data, indexes)
+            apply_user_change(data, change, indexes)
+            data["version"] = self._next_version(data)
+            self._append([dict(change, version=data["version"])])
+            self._fold_or_mark(data)
+        return refreshed
+
+    # Changes are appended to the journal with one write
+    def persist(self, data, changes, indexes=None):
+        with file_lock(self.path):
+            refreshed, kept, rejected = self._rebase(data, changes, indexes)
+            entries = []
+            for change in kept:
+                data["version"] = self._next_version(data)
+                entries.append(dict(change, version=data["version"]))
+            if entries:
+                self._append(entries)
+            self._fold_or_mark(data)
+        return refreshed, rejected
+
+    # Fold the journal into the snapshot once it is too large
+    def _fold_or_mark(self, data):
+        if self.journal_size() > JOURNAL_MAX_BYTES:
+            self._write(data)
+        else:
+            self._mark(data)
+
+
+_backends = {}
+
+
+# New storage backend for mode; directory holds its files instead of the
+# working directory, e.g. the partition of one user
+def create_backend(mode=None, directory=None):
+    mode = mode or STORAGE_MODE
+    data_file = os.path.join(directory, DATA_FILE) if directory else DATA_FILE
+    if mode == "sqlite":
+        from thesis_tracker.sqlite_storage import DB_FILE, SqliteStorage
+
+        if directory:
+            return SqliteStorage(
+                os.path.join(directory, os.path.basename(DB_FILE)), data_file
+            )
+        return SqliteStorage()
+    elif mode == "json":
+        return JsonStorage(data_file)
+    elif mode == "journal":
+        return JournalStorage(data_file)
+    raise ValueError(f"Unknown storage mode: {mode}")
+
+
+# Storage backend for the configured mode
+def get_backend(mode=None):
+    mode = mode or STORAGE_MODE
+    if mode not in _backends:
+        _backends[mode] = create_backend(mode)
+    return _backends[mode]
+
+
+# Function to load data
+def load_data(backend=None):
+    backend = backend or get_backend()
+    while True:
+        with instrumentation.timed("load"):
+            data = backend.load()
+        if not assign_ids(data):
+            return data
+        # Records saved before they had ids get them once
+        try:
+            with instrumentation.timed("save", save=True):
+                backend.save(data)
+            return data
+        except StaleDataError:
+            # Another session saved meanwhile; give its data the ids instead
+            continue
+
+
+# Function to save data
+def save_data(data):
+    with instrumentation.timed("save", save=True):
+        get_backend().save(data)
@@ -0,0 +1,120 @@
+"""Synthetic thesis data for testing and benchmarking at scale.
+
+``synthetic_data`` builds a data dict in memory; ``write_synthetic`` streams
+a ``thesis_data.json`` file one record at a time, so files of a million
+reports can be written without holding them. The same seed gives the same
+data. The reports are spread evenly over ``SPAN_DAYS`` days from ``START``
+in time order, as if logged day by day; the to-dos are due in the same span
+and the year after it.
+
+Write a data file from the command line:
+
+    python -m thesis_tracker.synthetic thesis_data.json --reports 1000000 --todos 100000
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from thesis_tracker.exporter import iter_export
+from thesis_tracker.records import Report, Step, TodoTask
+
+# The app's default categories and tags
+CATEGORIES = [
+    "Introduction",
+    "Literature Review",
+    "Methodology",
+    "Results",
+    "Discussion",
+    "Conclusion",
+    "Writing",
+    "Research",
+    "Data Analysis",
+    "Meetings",
+    "Other",
+]
+TAGS = ["Important", "Urgent", "Long-term"]
+PRIORITIES = ["High", "Medium", "Low"]
+SECTIONS = CATEGORIES[:6]
+TASKS = [f"Task {i}" for i in range(1, 201)]
+NOTES = ["", "", "Worked on the thesis.", "Read two papers, took notes on both."]
+START = datetime(2022, 1, 1, 9)
+SPAN_DAYS = 4 * 365
+
+
+def iter_reports(n_reports, seed=0):
+    rng = random.Random(seed)
+    seconds = SPAN_DAYS * 86400 / max(n_reports, 1)
+    for i in range(n_reports):
+        yield Report(
+            date=START + timedelta(seconds=int(i * seconds)),
+            category=rng.choice(CATEGORIES),
+            task=rng.choice(TASKS),
+            time_spent=rng.randint(1, 16) / 4,
+            result_rating=rng.randint(0, 5),
+            focus_rating=rng.randint(0, 5),
+            note=rng.choice(NOTES),
+            id=f"r{i:08x}",
+        )
+
+
+def iter_todos(n_todos, seed=0):
+    rng = random.Random(seed + 1)
+    first_due = START.date()
+    for i in range(n_todos):
+        completed = rng.random() < 0.4
+        estimated_time = rng.randint(1, 40)
+        yield TodoTask(
+            name=f"To-do {i}",
+            category=rng.choice(CATEGORIES),
+            priority=rng.choice(PRIORITIES),
+            due_date=first_due + timedelta(days=rng.randrange(SPAN_DAYS + 365)),
+            estimated_time=estimated_time,
+            steps=[
+                Step(f"Step {j + 1}", completed or rng.random() < 0.5)
+                for j in range(rng.randint(0, 4))
+            ],
+            tags=rng.sample(TAGS, rng.randint(0, 2)),
+            completed=completed,
+            actual_time=estimated_time * rng.uniform(0.5, 2) if completed else 0,
+            id=f"t{i:08x}",
+        )
+
+
+# Data dict whose report and to-do lists are iterators when lazy is set
+def _data(n_reports, n_todos, seed, lazy):
+    rng = random.Random(seed + 2)
+    reports = iter_reports(n_reports, seed)
+    todos = iter_todos(n_todos, seed)
+    return {
+        "progress": {section: rng.randint(0, 100) for section in SECTIONS},
+        "reports": reports if lazy else list(reports),
+        "categories": list(CATEGORIES),
+        "tasks": list(TASKS),
+        "todo": todos if lazy else list(todos),
+        "tags": list(TAGS),
+    }
+
+
+def synthetic_data(n_reports, n_todos=1000, seed=0):
+    return _data(n_reports, n_todos, seed, lazy=False)
+
+
+# Write a data file of n_reports reports and n_todos to-dos to path
+def write_synthetic(path, n_reports, n_todos=1000, seed=0):
+    with open(path, "wb") as f:
+        f.writelines(iter_export(_data(n_reports, n_todos, seed, lazy=True), "json"))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic data file.")
+    parser.add_argument("path", nargs="?", default="thesis_data.json")
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("--todos", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(args)
+    write_synthetic(args.path, args.reports, args.todos, args.seed)
+
+
+if __name__ == "__main__":
+    main()
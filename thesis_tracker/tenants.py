@@ -0,0 +1,102 @@
+"""Per-user data partitions for multi-user deployments.
+
+With ``THESIS_TENANTS`` set, every user gets their own partition: a directory
+below ``THESIS_TENANT_DIR`` holding that user's data files in the configured
+storage mode. Users are identified by
+
+* ``header``: a request header set by an authenticating proxy
+  (``THESIS_TENANT_HEADER``, default ``X-Forwarded-User``),
+* ``query``: a query parameter (``THESIS_TENANT_PARAM``, default ``user``),
+* ``login``: a user name entered in the app.
+
+Partitions are loaded when their user first shows up, and at most
+``THESIS_MAX_TENANTS`` datasets stay in memory; the least recently used one is
+dropped when another has to be loaded.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from thesis_tracker.dataset import open_dataset
+
+# "", "header", "query" or "login"
+TENANT_MODE = os.environ.get("THESIS_TENANTS", "")
+TENANT_HEADER = os.environ.get("THESIS_TENANT_HEADER", "X-Forwarded-User")
+TENANT_PARAM = os.environ.get("THESIS_TENANT_PARAM", "user")
+TENANT_DIR = os.environ.get("THESIS_TENANT_DIR", "tenants")
+MAX_TENANTS = int(os.environ.get("THESIS_MAX_TENANTS", "32"))
+
+
+# Directory name of a user's partition; names that are not plain file names
+# are hashed so that they cannot escape TENANT_DIR
+def partition_name(tenant):
+    if re.fullmatch(r"[A-Za-z0-9_-][A-Za-z0-9_.@-]{0,63}", tenant):
+        return tenant
+    return hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32]
+
+
+class TenantDatasets:
+    """Lazily loaded datasets of the users, bounded by an LRU policy.
+
+    ``get(None)`` returns the dataset of the unpartitioned data files, used
+    when multi-tenancy is off.
+    """
+
+    def __init__(
+        self, mode=None, max_resident=MAX_TENANTS, directory=TENANT_DIR, writer=None
+    ):
+        self.mode = mode
+        # BackgroundWriter saving the changes of all datasets, if any
+        self.writer = writer
+        self.max_resident = max_resident
+        self.directory = directory
+        self.datasets = OrderedDict()
+        # Guards datasets and loading; held only briefly
+        self.lock = threading.Lock()
+        # tenant -> lock held while that tenant's dataset is being loaded
+        self.loading = {}
+
+    def _resident(self, tenant):
+        dataset = self.datasets.get(tenant)
+        if dataset is not None:
+            self.datasets.move_to_end(tenant)
+        return dataset
+
+    def get(self, tenant=None):
+        with self.lock:
+            dataset = self._resident(tenant)
+            if dataset is not None:
+                return dataset
+            loading = self.loading.setdefault(tenant, threading.Lock())
+        # Parsing a history takes a while, so only the sessions of the same
+        # user wait for it; they get the dataset the first of them loads
+        with loading:
+            with self.lock:
+                dataset = self._resident(tenant)
+            if dataset is not None:
+                return dataset
+            try:
+                dataset = open_dataset(self._directory(tenant), self.mode, self.writer)
+            except BaseException:
+                with self.lock:
+                    self.loading.pop(tenant, None)
+                raise
+            with self.lock:
+                self.loading.pop(tenant, None)
+                self.datasets[tenant] = dataset
+                while len(self.datasets) > self.max_resident:
+                    self.datasets.popitem(last=False)
+            return dataset
+
+    def _directory(self, tenant):
+        if tenant is None:
+            return None
+        directory = os.path.join(self.directory, partition_name(tenant))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def __len__(self):
+        return len(self.datasets)
@@ -0,0 +1,70 @@
+"""Pomodoro work/break timer.
+
+The timer only stores its phase and either the time it ends at (running) or
+the time that was left when it was stopped (paused). The remaining time is
+computed on demand, so nothing has to run while the timer counts down.
+"""
+
+from datetime import datetime, timedelta
+
+WORK_MINUTES = 25
+BREAK_MINUTES = 5
+
+
+class PomodoroTimer:
+    """Work/break timer computed from timestamps."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.phase = "work"
+        self.end_time = None
+        self.remaining = self.duration()
+
+    def duration(self):
+        minutes = WORK_MINUTES if self.phase == "work" else BREAK_MINUTES
+        return timedelta(minutes=minutes)
+
+    @property
+    def running(self):
+        return self.end_time is not None
+
+    def start(self, now=None):
+        if not self.running:
+            self.end_time = (now or datetime.now()) + self.remaining
+
+    def stop(self, now=None):
+        if self.running:
+            self.remaining = self.time_left(now)
+            self.end_time = None
+
+    def toggle(self, now=None):
+        if self.running:
+            self.stop(now)
+        else:
+            self.start(now)
+
+    def time_left(self, now=None):
+        if not self.running:
+            return self.remaining
+        return max(self.end_time - (now or datetime.now()), timedelta(0))
+
+    def finished(self, now=None):
+        return self.running and self.time_left(now) == timedelta(0)
+
+    # Switch from work to a running break, or from a break back to a stopped
+    # work session; returns the phase that just ended
+    def next_phase(self, now=None):
+        ended = self.phase
+        self.phase = "break" if ended == "work" else "work"
+        self.end_time = None
+        self.remaining = self.duration()
+        if ended == "work":
+            self.start(now)
+        return ended
+
+    # mm:ss of the remaining time
+    def display(self, now=None):
+        mins, secs = divmod(int(self.time_left(now).total_seconds()), 60)
+        return f"{mins:02d}:{secs:02d}"
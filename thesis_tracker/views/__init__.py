@@ -0,0 +1,27 @@
+"""The pages of the app, one module per page.
+
+Streamlit re-executes the app script on every interaction, so the script only
+draws the navigation and sidebar and hands the current page to ``render``. A
+page's module is imported the first time the page is shown; pandas and plotly
+are only imported by the pages that chart (Progress, Statistics, Gantt Chart),
+so the first paint and the Home and To-Do reruns do not load them.
+"""
+
+import importlib
+
+# Sidebar label -> module of thesis_tracker.views rendering the page
+PAGES = {
+    "Home 🏠": "home",
+    "To-Do List 📋": "todo",
+    "Tasks and Reports 📝": "reports",
+    "Progress 📊": "progress",
+    "Statistics 📈": "statistics",
+    "Manage Categories 🏷️": "categories",
+    "Gantt Chart 📅": "gantt",
+    "Export/Import 💾": "transfer",
+}
+
+
+# Draw a page of the dataset of this session
+def render(page, dataset):
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render(dataset)
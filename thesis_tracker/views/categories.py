@@ -0,0 +1,34 @@
+"""Manage Categories page."""
+
+import streamlit as st
+
+from thesis_tracker.views.common import CATEGORY_EMOJIS, update
+
+
+def render(dataset):
+    st.header("Manage Categories 🏷️")
+
+    # Display current categories
+    st.subheader("Current Categories 📂")
+    for category in dataset.data["categories"]:
+        st.write(f"{CATEGORY_EMOJIS.get(category, '🔹')} {category}")
+
+    # Add new category
+    new_category = st.text_input("New Category 🆕")
+    if st.button("Add Category ➕"):
+        if new_category and new_category not in dataset.data["categories"]:
+            update(dataset, "append", ["categories"], new_category)
+            st.success(f"Added new category: {new_category} 🎉")
+        else:
+            st.error("Please enter a unique category name. ❌")
+
+    # Remove category
+    category_to_remove = st.selectbox(
+        "Select Category to Remove", dataset.data["categories"]
+    )
+    if st.button("Remove Category ➖"):
+        if category_to_remove in dataset.data["categories"]:
+            update(dataset, "discard", ["categories"], category_to_remove)
+            st.success(f"Removed category: {category_to_remove} 🗑️")
+        else:
+            st.error("Category not found. ❌")
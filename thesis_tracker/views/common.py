@@ -0,0 +1,124 @@
+"""Constants and widget helpers shared by the pages."""
+
+import streamlit as st
+
+from thesis_tracker.figures import FigureCache
+from thesis_tracker.instrumentation import resident_bytes
+from thesis_tracker.storage import StaleDataError, new_id
+
+# Emojis for categories and priority levels
+CATEGORY_EMOJIS = {
+    "Introduction": "📝",
+    "Literature Review": "📚",
+    "Methodology": "🔬",
+    "Results": "📊",
+    "Discussion": "💬",
+    "Conclusion": "🏁",
+    "Writing": "✍️",
+    "Research": "🔎",
+    "Data Analysis": "📈",
+    "Meetings": "👥",
+    "Other": "🔧",
+}
+PRIORITY_EMOJIS = {"High": "🔴", "Medium": "🟠", "Low": "🟢"}
+
+# Long lists are rendered a page at a time
+PAGE_SIZES = [10, 25, 50, 100]
+
+STALE_WARNING = "This item was changed in another session, your change was not saved."
+REJECTED_WARNING = (
+    "{} of your changes were not saved: the items were changed in another session."
+)
+
+
+# Built chart figures, shared by all sessions of this process
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+
+# Key of this browser session in the shared dataset
+def session_key():
+    return st.session_state.setdefault("session_key", new_id())
+
+
+# Apply a change to the data and persist it
+def update(dataset, op, path, value=None):
+    try:
+        dataset.update(op, path, value, session_key())
+    except StaleDataError:
+        st.warning(STALE_WARNING)
+
+
+# Delete a report by id
+def remove_report(dataset, report_id):
+    try:
+        dataset.remove_report(report_id, session_key())
+    except StaleDataError:
+        st.warning(STALE_WARNING)
+
+
+# Warn about changes of this session that the background writer could not
+# save, because their items were changed in another session meanwhile
+def report_rejected(dataset):
+    rejected = dataset.take_rejected(session_key())
+    if len(rejected) == 1:
+        st.warning(STALE_WARNING)
+    elif rejected:
+        st.warning(REJECTED_WARNING.format(len(rejected)))
+
+
+# on_change callback writing a widget's new value to path
+def store_widget(dataset, key, path):
+    update(dataset, "set", path, st.session_state[key])
+
+
+# Widget arguments binding a widget to the value at path. The data is shared
+# with other sessions, so the widget is seeded from it on every run and only
+# writes back when the user changes it.
+def bound(dataset, key, value, path):
+    st.session_state[key] = value
+    return {"key": key, "on_change": store_widget, "args": (dataset, key, path)}
+
+
+# Number of items of a long list to render; grows with "Load more"
+def window_limit(key):
+    page_size = st.selectbox("Items per page", PAGE_SIZES, key=f"{key}_page_size")
+    return page_size * st.session_state.get(f"{key}_pages", 1)
+
+
+def load_more_button(key, shown, total):
+    if shown < total:
+        st.caption(f"Showing {shown} of {total}")
+        if st.button("Load more", key=f"{key}_load_more"):
+            st.session_state[f"{key}_pages"] = (
+                st.session_state.get(f"{key}_pages", 1) + 1
+            )
+            st.rerun()
+
+
+# Sidebar panel with the metrics of a finished run (THESIS_METRICS=1)
+def metrics_panel(run):
+    cache = figure_cache()
+    with st.sidebar.expander("Debug metrics 🐞"):
+        st.caption(
+            f"Run: {run.seconds * 1000:.0f} ms · saves: {run.saves} · written: "
+            f"{run.bytes_written} B · session: {run.session_bytes / 1e3:.1f} kB · "
+            f"process: {resident_bytes() / 1e6:.0f} MB · figure cache: "
+            f"{cache.hits} hits, {cache.misses} misses"
+        )
+        rows = [
+            ("section", name, calls, seconds)
+            for name, (calls, seconds) in run.sections.items()
+        ] + [
+            ("storage", name, calls, seconds)
+            for name, (calls, seconds) in run.storage.items()
+        ]
+        # Markdown rather than a dataframe, so that pandas is not imported
+        st.markdown(
+            "| | | calls | ms |\n|---|---|---:|---:|\n"
+            + "\n".join(
+                f"| {kind} | {name} | {calls} | {seconds * 1000:.1f} |"
+                for kind, name, calls, seconds in rows
+            )
+        )
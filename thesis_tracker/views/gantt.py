@@ -0,0 +1,50 @@
+"""Gantt Chart page: the to-dos on a timeline."""
+
+import streamlit as st
+
+from thesis_tracker.charts import gantt_figure
+from thesis_tracker.gantt import gantt_bars
+from thesis_tracker.views.common import figure_cache
+
+LEVEL_NAMES = {
+    "week": "weekly",
+    "month": "monthly",
+    "quarter": "quarterly",
+    "year": "yearly",
+}
+
+
+def render(dataset):
+    st.header("Gantt Chart 📅")
+
+    index = dataset.indexes["todo"]
+    if len(index):
+        # The window defaults to the due dates of all to-dos
+        by_due_date = index.orderings["Due Date"]
+        first = index.get(by_due_date[0][2]).due_date
+        last = index.get(by_due_date[-1][2]).due_date
+        window = st.date_input("Date window", (first, last))
+        start, end = (tuple(window) + (None, None))[:2]
+        hide_completed = st.checkbox("Hide completed tasks")
+
+        # Cached with the level of detail; the bars are only computed on a miss
+        def build():
+            level, bars = gantt_bars(
+                dataset.data["todo"], start, end, include_completed=not hide_completed
+            )
+            return level, gantt_figure(bars) if bars else None
+
+        key = ("gantt", dataset.revision, start, end, hide_completed)
+        level, fig = figure_cache().get(key, build)
+        if fig is None:
+            st.write("No tasks in this date window.")
+            return
+        if level != "task":
+            st.caption(
+                f"Too many tasks to show one by one: showing the tasks due in each "
+                f"{level} as {LEVEL_NAMES[level]} bars per category. Narrow the "
+                f"date window to see single tasks."
+            )
+        st.plotly_chart(fig)
+    else:
+        st.write("No tasks available to display in the Gantt chart.")
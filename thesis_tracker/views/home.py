@@ -0,0 +1,64 @@
+"""Home page: what the app is for and how to use it."""
+
+import streamlit as st
+
+
+def render(dataset):
+    st.header("Welcome to your academic buddy! 🎓")
+
+    st.subheader("Why This App Exists")
+    st.write(
+        """
+    I created this Thesis Tracker for two main reasons:
+    1. **Productive Procrastination**: Let's face it, sometimes we need a break from actual thesis writing.
+       What better way to procrastinate than by building a tool to manage your thesis? 😉
+    2. **Genuine Productivity Boost**: Despite its origins, this app has become an invaluable tool for managing
+       my thesis progress, keeping track of tasks, and maintaining focus during work sessions.
+    """
+    )
+
+    st.subheader("How to Use This App")
+    st.write(
+        """
+    1. **To-Do List 📋**: Add and manage your thesis tasks. Break them down into steps, set priorities, and track progress.
+    2. **Tasks and Reports 📝**: Log your work sessions and keep detailed reports of your progress.
+    3. **Progress 📊**: Visualize your overall thesis progress across different sections.
+    4. **Statistics 📈**: Analyze your productivity trends and time allocation.
+    5. **Manage Categories 🏷️**: Customize categories to fit your thesis structure.
+    6. **Gantt Chart 📅**: Get a timeline view of your tasks and deadlines.
+    7. **Export/Import 💾**: Backup your data or transfer it between devices.
+    """
+    )
+
+    st.subheader("Tips and Tricks")
+    st.write(
+        """
+    - **Use the Work Timer**: Work in focused 25-minute sessions with short breaks in between.
+    - **Regular Updates**: Keep your task list and progress up to date for better motivation.
+    - **Analyze Your Stats**: Use the Statistics page to understand your productivity patterns.
+    - **Break Down Tasks**: Use the steps feature in tasks to make large chunks of work more manageable.
+    - **Celebrate Progress**: Don't forget to acknowledge your achievements, no matter how small!
+    """
+    )
+
+    st.subheader("About the Developer")
+    st.write(
+        """
+    This app was developed by [myself](https://github.com/Jannik-Hoffmann) as a side project while working on my thesis.
+    If you're interested in the code or want to contribute, check out the project on GitHub:
+    """
+    )
+    st.markdown(
+        "[GitHub Repository](https://github.com/Jannik-Hoffmann/Thesis-Tracker/)"
+    )
+
+    st.subheader("Feedback and Contributions")
+    st.write(
+        """
+    Found a bug? Have a feature request? Feel free to open an issue or submit a pull request on GitHub.
+    Your feedback and contributions are welcome!
+    """
+    )
+
+    st.markdown("---")
+    st.write("Now, let's get back to that thesis! 💪📚")
@@ -0,0 +1,45 @@
+"""Progress page: per-section progress as a pie chart and sliders."""
+
+import streamlit as st
+
+from thesis_tracker.charts import progress_figure
+from thesis_tracker.views.common import CATEGORY_EMOJIS, bound, figure_cache
+
+
+def render(dataset):
+    st.header("Thesis Progress 📊")
+
+    sections = [
+        "Introduction",
+        "Literature Review",
+        "Methodology",
+        "Results",
+        "Discussion",
+        "Conclusion",
+    ]
+
+    # Circle diagram
+    values = [dataset.data["progress"].get(section, 0) for section in sections]
+
+    labels = [f"{CATEGORY_EMOJIS[s]} {s}" for s in sections]
+    st.plotly_chart(
+        figure_cache().get(
+            ("progress", tuple(values)), lambda: progress_figure(labels, values)
+        )
+    )
+
+    # Progress bars
+    for section in sections:
+        st.write(f"{CATEGORY_EMOJIS[section]} **{section}**")
+        progress = st.slider(
+            f"{section} Progress",
+            0,
+            100,
+            **bound(
+                dataset,
+                section,
+                dataset.data["progress"].get(section, 0),
+                ["progress", section],
+            ),
+        )
+        st.progress(progress)
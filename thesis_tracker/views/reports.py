@@ -0,0 +1,116 @@
+"""Tasks and Reports page: logging, browsing by week and searching work sessions."""
+
+from datetime import datetime
+
+import streamlit as st
+
+from thesis_tracker.records import Report
+from thesis_tracker.views.common import (
+    CATEGORY_EMOJIS,
+    load_more_button,
+    remove_report,
+    update,
+    window_limit,
+)
+
+
+def show_report(dataset, report):
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        st.write(
+            f"**{report.date.strftime('%Y-%m-%d %H:%M')}** - {CATEGORY_EMOJIS[report.category]} {report.category}: {report.task}"
+        )
+        st.write(f"⏱️ Time spent: {report.time_spent} hours")
+        st.write(f"⭐ Result rating: {'⭐' * report.result_rating}")
+        st.write(f"🎯 Focus rating: {'🎯' * report.focus_rating}")
+        st.write(f"📌 Note: {report.note}")
+    with col2:
+        if st.button("Delete 🗑️", key=f"delete_{report.id}"):
+            remove_report(dataset, report.id)
+            st.rerun()
+    st.write("---")
+
+
+def render(dataset):
+    st.header("Tasks and Reports 📝")
+
+    # Add new report
+    with st.form("new_report"):
+        st.subheader("Add New Report ✍️")
+        category = st.selectbox(
+            "Category",
+            [f"{CATEGORY_EMOJIS[cat]} {cat}" for cat in dataset.data["categories"]],
+        )
+        category = category.split(" ", 1)[1]  # Remove emoji from category
+        task = st.selectbox(
+            "Task",
+            ["New task..."]
+            + dataset.data["tasks"]
+            + [t.name for t in dataset.data["todo"]],
+        )
+        if task == "New task...":
+            task = st.text_input("New task")
+        time_spent = st.number_input("Time spent (hours) ⏱️", min_value=0.0, step=0.5)
+        result_rating = st.slider("Result rating ⭐", 0, 5, 3)
+        focus_rating = st.slider("Focus rating 🎯", 0, 5, 3)
+        note = st.text_area("Notes 📌")
+        submitted = st.form_submit_button("Submit Report 📤")
+        if submitted:
+            if task not in dataset.data["tasks"]:
+                update(dataset, "append", ["tasks"], task)
+            dataset.add_report(
+                Report(
+                    date=datetime.now(),
+                    category=category,
+                    task=task,
+                    time_spent=time_spent,
+                    result_rating=result_rating,
+                    focus_rating=focus_rating,
+                    note=note,
+                )
+            )
+            # Update actual time for the corresponding todo item
+            for todo_item in dataset.data["todo"]:
+                if todo_item.name == task:
+                    update(
+                        dataset,
+                        "set",
+                        ["todo", todo_item.id, "actual_time"],
+                        todo_item.actual_time + time_spent,
+                    )
+                    break
+            st.success("Report added successfully! 🎉")
+
+    # Display reports
+    st.subheader("Reports 📋")
+    query = st.text_input(
+        "Search reports 🔍",
+        placeholder="Words or beginnings of words in tasks and notes",
+    )
+    limit = window_limit("reports")
+    if query:
+        # Best matches first, from the full-text index
+        reports, total = dataset.search("reports", query, limit)
+        if not total:
+            st.info("No reports match your search.")
+        for report in reports:
+            show_report(dataset, report)
+        load_more_button("reports", len(reports), total)
+        return
+
+    # Reports grouped by week, from the week index
+    report_index = dataset.indexes["reports"]
+    week_starts = report_index.newest_weeks()
+    for week_start in week_starts[:limit]:
+        # The reports of a week are only rendered while its expander is open
+        expander = st.expander(
+            f"Week of {week_start} 📅 ({report_index.week_size(week_start)} reports)",
+            key=f"week_{week_start}",
+            on_change="rerun",
+        )
+        if not expander.open:
+            continue
+        with expander:
+            for report in report_index.week_reports(week_start):
+                show_report(dataset, report)
+    load_more_button("reports", min(limit, len(week_starts)), len(week_starts))
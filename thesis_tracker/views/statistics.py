@@ -0,0 +1,54 @@
+"""Statistics page: charts of the report rollups."""
+
+import streamlit as st
+
+from thesis_tracker.charts import category_figure, daily_figure, daily_frame
+from thesis_tracker.views.common import figure_cache
+
+
+def render(dataset):
+    st.header("Statistics 📈")
+
+    rollups = dataset.rollups
+    total_time, avg_result, avg_focus, report_count = rollups.totals()
+
+    if report_count:
+        # The daily rollups change with the dataset's revision
+        def line_chart(columns):
+            key = ("daily", tuple(columns), dataset.revision)
+            st.plotly_chart(
+                figure_cache().get(
+                    key, lambda: daily_figure(daily_frame(rollups), columns)
+                )
+            )
+
+        # Time spent over time
+        st.subheader("Time Spent Over Time ⏱️")
+        line_chart(["Time Spent"])
+
+        # Average ratings over time
+        st.subheader("Average Ratings Over Time 📊")
+        line_chart(["Result Rating", "Focus Rating"])
+
+        # Total time spent
+        st.subheader(f"Total Time Spent: {total_time:.1f} hours ⌛")
+
+        # Average ratings
+        st.subheader(f"Average Result Rating: {avg_result:.2f} ⭐")
+        st.subheader(f"Average Focus Rating: {avg_focus:.2f} 🎯")
+
+        # Time spent by category
+        category_stats = tuple(rollups.category_stats())
+        st.subheader("Time Spent by Category")
+        st.plotly_chart(
+            figure_cache().get(
+                ("categories", category_stats),
+                lambda: category_figure(category_stats),
+            )
+        )
+
+        # Productivity score over time (combination of result and focus ratings)
+        st.subheader("Productivity Score Over Time")
+        line_chart(["Productivity Score"])
+    else:
+        st.write("No reports available yet. Add some reports to see statistics. 📊")
@@ -0,0 +1,175 @@
+"""To-Do List page: adding, searching, filtering and completing to-dos."""
+
+from datetime import datetime
+
+import streamlit as st
+
+from thesis_tracker.records import Report, Step, TodoTask
+from thesis_tracker.storage import new_id
+from thesis_tracker.views.common import (
+    CATEGORY_EMOJIS,
+    PRIORITY_EMOJIS,
+    bound,
+    load_more_button,
+    update,
+    window_limit,
+)
+
+
+# on_change callback of a to-do's "Complete" checkbox
+def complete_todo(dataset, key, task_id):
+    completed = st.session_state[key]
+    update(dataset, "set", ["todo", task_id, "completed"], completed)
+    task = dataset.indexes["todo"].by_id.get(task_id)
+    if completed and task is not None:
+        # Create a report when task is completed
+        dataset.add_report(
+            Report(
+                date=datetime.now(),
+                category=task.category,
+                task=task.name,
+                time_spent=task.actual_time,
+                result_rating=5,  # Default value, can be adjusted
+                focus_rating=5,  # Default value, can be adjusted
+                note=f"Task completed: {task.name}",
+            )
+        )
+
+
+def render(dataset):
+    st.header("To-Do List 📋")
+
+    # Add new task
+    with st.form("new_todo"):
+        st.subheader("Add New Task ✅")
+        task_name = st.text_input("Task Name")
+        category = st.selectbox(
+            "Category",
+            [f"{CATEGORY_EMOJIS[cat]} {cat}" for cat in dataset.data["categories"]],
+        )
+        category = category.split(" ", 1)[1]
+        priority = st.selectbox("Priority", list(PRIORITY_EMOJIS.keys()))
+        due_date = st.date_input("Due Date")
+        estimated_time = st.number_input(
+            "Estimated Time (hours)", min_value=0.0, step=0.5
+        )
+        steps = st.text_area("Steps (one per line)")
+        tags = st.multiselect("Tags", options=dataset.data["tags"] + ["Add new tag..."])
+        if "Add new tag..." in tags:
+            new_tag = st.text_input("New Tag")
+            if new_tag and new_tag not in dataset.data["tags"]:
+                update(dataset, "append", ["tags"], new_tag)
+                tags = [tag for tag in tags if tag != "Add new tag..."] + [new_tag]
+
+        submitted = st.form_submit_button("Add Task")
+        if submitted and task_name:
+            new_task = TodoTask(
+                id=new_id(),
+                name=task_name,
+                category=category,
+                priority=priority,
+                due_date=due_date,
+                estimated_time=estimated_time,
+                steps=[
+                    Step(step.strip()) for step in steps.split("\n") if step.strip()
+                ],
+                tags=tags,
+            )
+            update(dataset, "append", ["todo"], new_task)
+            if task_name not in dataset.data["tasks"]:
+                update(dataset, "append", ["tasks"], task_name)
+            st.success(f"Task '{task_name}' added successfully! 🎉")
+
+    # Display and manage tasks
+    st.subheader("Current Tasks")
+
+    query = st.text_input(
+        "Search to-dos 🔍",
+        placeholder="Words or beginnings of words in names, notes and steps",
+    )
+
+    # Filtering and sorting options
+    filter_category = st.multiselect(
+        "Filter by Category", options=dataset.data["categories"]
+    )
+    filter_priority = st.multiselect(
+        "Filter by Priority", options=list(PRIORITY_EMOJIS.keys())
+    )
+    filter_tags = st.multiselect("Filter by Tags", options=dataset.data["tags"])
+    sort_by = st.selectbox(
+        "Sort by", options=["Due Date", "Priority", "Estimated Time"]
+    )
+
+    limit = window_limit("todo")
+    if query:
+        # Best matches of the search among the filtered to-dos, best first
+        within = None
+        if filter_category or filter_priority or filter_tags:
+            within = {
+                task.id
+                for task in dataset.filter_todos(
+                    categories=filter_category,
+                    priorities=filter_priority,
+                    tags=filter_tags,
+                )
+            }
+        filtered_tasks, total = dataset.search("todo", query, limit, within)
+    else:
+        filtered_tasks = dataset.filter_todos(
+            categories=filter_category,
+            priorities=filter_priority,
+            tags=filter_tags,
+            sort_by=sort_by,
+        )
+        total = len(filtered_tasks)
+
+    for task in filtered_tasks[:limit]:
+        col1, col2, col3 = st.columns([0.5, 4, 0.5])
+        with col1:
+            key = f"todo_{task.id}"
+            st.session_state[key] = task.completed
+            st.checkbox(
+                "Complete",
+                key=key,
+                on_change=complete_todo,
+                args=(dataset, key, task.id),
+            )
+        with col2:
+            # The body is only built while the expander is open
+            expander = st.expander(
+                f"{PRIORITY_EMOJIS[task.priority]} {CATEGORY_EMOJIS[task.category]} {task.name} "
+                f"(Due: {task.due_date})",
+                key=f"todo_expander_{task.id}",
+                on_change="rerun",
+            )
+            if expander.open:
+                with expander:
+                    st.write(f"Estimated Time: {task.estimated_time} hours")
+                    st.write(f"Actual Time: {task.actual_time} hours")
+                    st.write("Steps:")
+                    for j, step in enumerate(task.steps):
+                        st.checkbox(
+                            step.step,
+                            **bound(
+                                dataset,
+                                f"step_{task.id}_{j}",
+                                step.completed,
+                                ["todo", task.id, "steps", j, "completed"],
+                            ),
+                        )
+                    st.write(f"Tags: {', '.join(task.tags)}")
+                    st.text_area(
+                        "Notes",
+                        **bound(
+                            dataset,
+                            f"notes_{task.id}",
+                            task.notes,
+                            ["todo", task.id, "notes"],
+                        ),
+                    )
+        with col3:
+            if st.button("Delete", key=f"delete_todo_{task.id}"):
+                update(dataset, "remove", ["todo", task.id])
+                st.rerun()
+
+    load_more_button("todo", min(limit, len(filtered_tasks)), total)
@@ -0,0 +1,97 @@
+"""Export/Import page."""
+
+import codecs
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from thesis_tracker.exporter import export_bytes, export_file, parquet_available
+from thesis_tracker.importer import import_data
+
+IMPORT_ERRORS_SHOWN = 100
+
+
+def render(dataset):
+    st.header("Export/Import Data 💾")
+
+    # Export data
+    st.subheader("Export")
+    formats = {
+        "JSON (importable)": "json",
+        "NDJSON": "ndjson",
+        "CSV (reports)": "reports.csv",
+        "CSV (to-dos)": "todo.csv",
+    }
+    if parquet_available():
+        formats["Parquet (reports)"] = "reports.parquet"
+    export_format = formats[st.selectbox("Format", list(formats))]
+    export_categories = st.multiselect(
+        "Only these categories", dataset.data["categories"]
+    )
+    export_range = None
+    if st.checkbox("Only a date range"):
+        export_range = st.date_input(
+            "Report dates / due dates",
+            (datetime.now().date() - timedelta(days=30), datetime.now().date()),
+        )
+    compress = st.checkbox("Compress (gzip)")
+    start, end = (
+        export_range if export_range and len(export_range) == 2 else (None, None)
+    )
+    mime, file_name = export_file(export_format, compress)
+    # The file is only generated when the button is clicked
+    st.download_button(
+        label="Export Data",
+        file_name=file_name,
+        mime=mime,
+        data=lambda: export_bytes(
+            dataset.data, export_format, start, end, export_categories, compress
+        ),
+    )
+
+    # Import data
+    uploaded_file = st.file_uploader("Choose a JSON file to import", type="json")
+    if uploaded_file is not None:
+        import_mode = st.radio(
+            "Import mode",
+            ["Merge with existing data", "Replace all data"],
+            help="Merging skips reports and to-dos that already exist.",
+        )
+        if st.button("Import Data"):
+            merge = import_mode == "Merge with existing data"
+            try:
+                uploaded_file.seek(0)
+                result = import_data(
+                    codecs.getreader("utf-8")(uploaded_file),
+                    existing=dataset.data if merge else None,
+                )
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(
+                    f"Invalid JSON file. Please upload a valid thesis_data.json file. ({e})"
+                )
+            else:
+                if merge:
+                    dataset.merge(result.data)
+                else:
+                    dataset.replace(result.data)
+                st.session_state.import_result = result
+                st.rerun()
+
+    # Summary of the last import
+    result = st.session_state.pop("import_result", None)
+    if result is not None:
+        counts = result.counts()
+        st.success(
+            f"Data imported successfully! {counts['reports']} reports and "
+            f"{counts['todo']} to-dos added, {result.duplicates} duplicates skipped."
+        )
+        if result.errors:
+            st.warning(f"{len(result.errors)} records could not be imported.")
+            with st.expander("Import errors"):
+                for section, position, message in result.errors[:IMPORT_ERRORS_SHOWN]:
+                    where = section if position is None else f"{section}[{position}]"
+                    st.write(f"**{where}**: {message}")
+                if len(result.errors) > IMPORT_ERRORS_SHOWN:
+                    st.caption(
+                        f"... and {len(result.errors) - IMPORT_ERRORS_SHOWN} more"
+                    )
@@ -0,0 +1,76 @@
+"""Debounced saving of datasets in a background thread.
+
+Without a writer, ``Dataset.update`` saves every change before it returns, so
+each click waits for a disk write (a whole-file rewrite with
+``THESIS_STORAGE=json``). With a writer, ``update`` applies the change in
+memory, marks the dataset dirty and returns; the writer thread saves all
+changes made within ``THESIS_WRITE_INTERVAL`` seconds (default 1) of the
+first one together, with one write. Pending changes are saved when the
+process exits, and before a dataset picks up changes saved by other
+processes. Set ``THESIS_WRITE_INTERVAL=0`` to save every change at once.
+"""
+
+import atexit
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+from thesis_tracker import instrumentation
+
+WRITE_INTERVAL = float(os.environ.get("THESIS_WRITE_INTERVAL", "1"))
+
+
+class BackgroundWriter:
+    """Thread saving the pending changes of dirty datasets once per interval."""
+
+    def __init__(self, interval=WRITE_INTERVAL):
+        self.interval = interval
+        # (time due, dataset) in the order the datasets became dirty
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.thread = None
+        atexit.register(self.flush_all)
+
+    # Save the pending changes of dataset once the interval has passed
+    def schedule(self, dataset):
+        with self.condition:
+            self.queue.append((time.monotonic() + self.interval, dataset))
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._run, name="thesis-writer", daemon=True
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                due, dataset = self.queue[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                self.queue.popleft()
+            self._flush(dataset)
+            if instrumentation.ENABLED:
+                instrumentation.finish_run("background writer")
+
+    def _flush(self, dataset):
+        try:
+            dataset.flush()
+        except Exception:
+            # The changes stay pending; try again after another interval
+            traceback.print_exc()
+            self.schedule(dataset)
+
+    # Save all pending changes now, e.g. when the process exits
+    def flush_all(self):
+        with self.condition:
+            datasets = [dataset for _, dataset in self.queue]
+            self.queue.clear()
+        for dataset in datasets:
+            self._flush(dataset)